@@ -7,7 +7,11 @@
 
 """CDS-RDM migration extract module."""
 
+import codecs
 import json
+import os
+import re
+import resource
 from os import listdir
 from os.path import isfile, join
 from pathlib import Path
@@ -15,26 +19,162 @@ from pathlib import Path
 import click
 from invenio_rdm_migrator.extract import Extract
 
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = " \t\n\r,]"
+
+
+def peak_rss():
+    """Return the peak resident set size of the process in MB."""
+    # ru_maxrss is expressed in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+
+def _show_peak_rss(item):
+    """Progress bar label with the current peak memory usage."""
+    return f"peak RSS {peak_rss()} MB"
+
+
+def iter_json_array(dump_file, chunk_size=1024 * 1024, after_item=False):
+    """Iterate over the items of a top-level JSON array with bounded memory.
+
+    Only the item being decoded and the read-ahead buffer are kept in memory,
+    so the size of the dump file does not matter.
+
+    :param dump_file: file object opened in binary mode.
+    :param chunk_size: number of bytes to read ahead at once.
+    :param after_item: the file is positioned right after an item of the array,
+                       e.g. at an offset previously yielded.
+    :returns: generator of ``(item, offset)`` tuples, where ``offset`` is the
+              byte position in the file right after the item.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    # byte offset in the file of buffer[pos]
+    offset = dump_file.tell()
+    eof = False
+    # next expected token: "[", "value or ]", ",", "value" or "end"
+    expect = "," if after_item else "["
+
+    def advance(end):
+        nonlocal pos, offset
+        offset += len(buffer[pos:end].encode("utf-8"))
+        pos = end
+
+    def read_ahead():
+        nonlocal buffer, pos, eof
+        # grow the read size with the pending data to keep decoding linear
+        buffer, pos = buffer[pos:], 0
+        chunk = dump_file.read(max(chunk_size, len(buffer)))
+        eof = not chunk
+        buffer += utf8.decode(chunk, final=eof)
+
+    while True:
+        advance(_WHITESPACE.match(buffer, pos).end())
+        if pos == len(buffer):
+            if not eof:
+                read_ahead()
+                continue
+            if expect == "end":
+                return
+            raise ValueError(f"Unexpected end of JSON array at byte {offset}.")
+
+        char = buffer[pos]
+        if expect == "end":
+            raise ValueError(f"Unexpected data after JSON array at byte {offset}.")
+        elif expect == "[":
+            if char != "[":
+                raise ValueError(f"Expected a JSON array at byte {offset}.")
+            advance(pos + 1)
+            expect = "value or ]"
+        elif char == "]" and expect in (",", "value or ]"):
+            advance(pos + 1)
+            expect = "end"
+        elif expect == ",":
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' at byte {offset}.")
+            advance(pos + 1)
+            expect = "value"
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_ahead()
+                continue
+            if not eof and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+                # a value not followed by a delimiter might be truncated,
+                # e.g. the number 1.5e3 read as 1
+                read_ahead()
+                continue
+            advance(end)
+            expect = ","
+            yield item, offset
+
 
 class LegacyExtract(Extract):
     """LegacyExtract."""
 
-    def __init__(self, dirpath):
-        """Constructor."""
+    def __init__(self, dirpath, stream_parse=False, checkpoint=None):
+        """Constructor.
+
+        :param dirpath: directory containing the JSON dump files.
+        :param stream_parse: parse the dump files incrementally, one record at
+                             a time, instead of loading each file in memory.
+        :param checkpoint: checkpoint store to report the position of the
+                           records to and to resume from. Implies stream_parse.
+        """
         self.dirpath = Path(dirpath).absolute()
+        self.stream_parse = stream_parse or checkpoint is not None
+        self.checkpoint = checkpoint
+
+    def _load_records(self, filepath):
+        """Load all the records of a dump file at once."""
+        with open(filepath, "r") as dump_file:
+            data = json.load(dump_file)
+            with click.progressbar(data, item_show_func=_show_peak_rss) as records:
+                for dump_record in records:
+                    yield dump_record
+
+    def _stream_records(self, filepath):
+        """Stream the records of a dump file one at a time."""
+        filename = os.path.basename(filepath)
+        resume_offset = None
+        if self.checkpoint:
+            resume_offset = self.checkpoint.resume_offset(filename)
+        with open(filepath, "rb") as dump_file:
+            with click.progressbar(
+                length=os.path.getsize(filepath), item_show_func=_show_peak_rss
+            ) as progress:
+                if resume_offset is not None:
+                    click.secho(f"resuming {filename} at byte {resume_offset}")
+                    dump_file.seek(resume_offset)
+                    progress.update(resume_offset)
+                records = iter_json_array(
+                    dump_file, after_item=resume_offset is not None
+                )
+                for dump_record, offset in records:
+                    progress.update(offset - progress.pos, dump_record)
+                    if self.checkpoint:
+                        self.checkpoint.extracted(
+                            dump_record["recid"], filename, offset
+                        )
+                    yield dump_record
 
     def run(self):
         """Run."""
-        files = [
+        files = sorted(
             f
             for f in listdir(self.dirpath)
             if isfile(join(self.dirpath, f)) and not f.startswith(".")
-        ]
+        )
         total = len(files)
         for i, file in enumerate(files):
             click.secho(f"processing file {file} ({i}/{total})", fg="green", bold=True)
-            with open(join(self.dirpath, file), "r") as dump_file:
-                data = json.load(dump_file)
-                with click.progressbar(data) as records:
-                    for dump_record in records:
-                        yield dump_record
+            filepath = join(self.dirpath, file)
+            if self.stream_parse:
+                yield from self._stream_records(filepath)
+            else:
+                yield from self._load_records(filepath)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Index of the already migrated legacy recids."""
+
+from invenio_db import db
+from invenio_pidstore.models import PersistentIdentifier
+
+
+class LegacyRecidIndex:
+    """In-memory set of the minted legacy recids (`lrecid` pids).
+
+    It is shared by the transform and load steps and loaded with a single
+    query, so checking whether a record was already migrated is a set lookup.
+    """
+
+    _recids = None
+
+    @staticmethod
+    def _key(recid):
+        """Store numeric recids as integers, which takes less memory."""
+        recid = str(recid)
+        if recid.isdigit() and not recid.startswith("0"):
+            return int(recid)
+        return recid
+
+    @classmethod
+    def load(cls):
+        """Load all the minted legacy recids."""
+        query = db.session.query(PersistentIdentifier.pid_value).filter_by(
+            pid_type="lrecid"
+        )
+        cls._recids = {cls._key(pid_value) for (pid_value,) in query.yield_per(10000)}
+
+    @classmethod
+    def contains(cls, recid):
+        """Check if the legacy recid was minted."""
+        if cls._recids is None:
+            cls.load()
+        return cls._key(recid) in cls._recids
+
+    @classmethod
+    def add(cls, recid):
+        """Register a newly minted legacy recid."""
+        if cls._recids is not None:
+            cls._recids.add(cls._key(recid))
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the index, it is loaded again on the next lookup."""
+        cls._recids = None
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration persistent cache of the ROR affiliation matches."""
+
+import json
+import os
+import sqlite3
+import time
+import zipfile
+from contextlib import contextmanager
+
+from cds_migrator_kit.extract.extract import iter_json_array
+
+DAY = 24 * 60 * 60
+
+
+def normalize_affiliation(affiliation):
+    """Return the cache key of an affiliation (case and spaces insensitive)."""
+    return " ".join(affiliation.casefold().split())
+
+
+def _organization_names(organization):
+    """Return the names of a ROR organization and their matching type.
+
+    The name and the labels are exact matches, the aliases and the acronyms
+    are not, they are only suggested.
+    """
+    if "names" in organization:
+        # schema v2
+        names = []
+        for name in organization["names"]:
+            types = name.get("types", [])
+            if "ror_display" in types or "label" in types:
+                matching_type = "EXACT"
+            elif "acronym" in types:
+                matching_type = "ACRONYM"
+            else:
+                matching_type = "ALIAS"
+            names.append((name["value"], matching_type))
+        return names
+    names = [(organization["name"], "EXACT")]
+    names += [(alias, "ALIAS") for alias in organization.get("aliases", [])]
+    names += [(acronym, "ACRONYM") for acronym in organization.get("acronyms", [])]
+    names += [(label["label"], "EXACT") for label in organization.get("labels", [])]
+    return names
+
+
+@contextmanager
+def _open_dump(filepath):
+    """Open a ROR data dump, as JSON or as the zip file it is published in."""
+    if zipfile.is_zipfile(filepath):
+        with zipfile.ZipFile(filepath) as archive:
+            members = [name for name in archive.namelist() if name.endswith(".json")]
+            if not members:
+                raise ValueError(f"No JSON file in {filepath}")
+            # the v2 schema file, if both are published
+            member = next((name for name in members if "v2" in name), members[0])
+            with archive.open(member) as dump_file:
+                yield dump_file
+    else:
+        with open(filepath, "rb") as dump_file:
+            yield dump_file
+
+
+class RORCache:
+    """SQLite cache of the ROR matches of the affiliations.
+
+    The matches (``items`` of the ROR affiliation API response) are kept by
+    normalized affiliation. The ones without any item are kept as well, for
+    a shorter time. The names seeded from a ROR data dump are kept apart, as
+    a fallback when the API is not queried or does not answer.
+    """
+
+    def __init__(self, filepath, ttl=90 * DAY, negative_ttl=7 * DAY):
+        """Constructor.
+
+        :param filepath: path of the SQLite database.
+        :param ttl: seconds after which a match is queried again.
+        :param negative_ttl: seconds after which an affiliation without match
+                             is queried again.
+        """
+        self.filepath = filepath
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.seeded_hits = 0
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+        self._connection = sqlite3.connect(filepath)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS ror ("
+            "affiliation TEXT PRIMARY KEY, items TEXT, fetched REAL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS ror_dump ("
+            "affiliation TEXT PRIMARY KEY, items TEXT)"
+        )
+        # names seeded in the responses table by the previous versions
+        self._connection.execute("DELETE FROM ror WHERE fetched IS NULL")
+        self._connection.commit()
+
+    def close(self):
+        """Close the cache."""
+        self._connection.close()
+
+    def get(self, affiliation, expire=True):
+        """Return the cached ROR items of an affiliation or None.
+
+        :param expire: ignore the entries older than their TTL.
+        """
+        row = self._connection.execute(
+            "SELECT items, fetched FROM ror WHERE affiliation = ?",
+            (normalize_affiliation(affiliation),),
+        ).fetchone()
+        if row:
+            items = json.loads(row[0])
+            ttl = self.ttl if items else self.negative_ttl
+            if not expire or time.time() - row[1] < ttl:
+                self.hits += 1
+                return items
+        self.misses += 1
+        return None
+
+    def get_seeded(self, affiliation):
+        """Return the ROR items of an affiliation seeded from a dump or None."""
+        row = self._connection.execute(
+            "SELECT items FROM ror_dump WHERE affiliation = ?",
+            (normalize_affiliation(affiliation),),
+        ).fetchone()
+        if row:
+            self.seeded_hits += 1
+            return json.loads(row[0])
+        return None
+
+    def set(self, affiliation, items):
+        """Cache the ROR items of an affiliation."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO ror VALUES (?, ?, ?)",
+            (normalize_affiliation(affiliation), json.dumps(items), time.time()),
+        )
+        self._connection.commit()
+
+    def import_dump(self, filepath):
+        """Seed the cache with the names of the organizations of a ROR dump.
+
+        Each name and label is an exact match of its organization, chosen
+        unless several organizations have the same name. The aliases and the
+        acronyms are not chosen. The names of a previous dump are replaced,
+        the API responses are kept.
+
+        :returns: the number of organizations imported.
+        """
+        self._connection.execute("DELETE FROM ror_dump")
+        seeded = set()
+        count = 0
+        with _open_dump(filepath) as dump_file:
+            for organization, _ in iter_json_array(dump_file):
+                count += 1
+                names = {}
+                for name, matching_type in _organization_names(organization):
+                    key = normalize_affiliation(name)
+                    # an exact match wins over an alias or acronym
+                    if key and (key not in names or matching_type == "EXACT"):
+                        names[key] = (name, matching_type)
+                for key, (name, matching_type) in names.items():
+                    self._seed(key, name, matching_type, organization, seeded)
+                if count % 10000 == 0:
+                    self._connection.commit()
+        self._connection.commit()
+        return count
+
+    def _seed(self, key, name, matching_type, organization, seeded):
+        item = {
+            "substring": name,
+            "score": 1.0,
+            "matching_type": matching_type,
+            "chosen": matching_type == "EXACT",
+            "organization": organization,
+        }
+        if key not in seeded:
+            self._connection.execute(
+                "INSERT INTO ror_dump VALUES (?, ?)", (key, json.dumps([item]))
+            )
+            seeded.add(key)
+            return
+        # same name as another organization of the dump: ambiguous
+        (items,) = self._connection.execute(
+            "SELECT items FROM ror_dump WHERE affiliation = ?", (key,)
+        ).fetchone()
+        items = json.loads(items) + [item]
+        for item in items:
+            item["chosen"] = False
+        self._connection.execute(
+            "UPDATE ror_dump SET items = ? WHERE affiliation = ?",
+            (json.dumps(items), key),
+        )
+
+    @property
+    def stats(self):
+        """Return the cache usage counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "seeded_hits": self.seeded_hits,
+        }
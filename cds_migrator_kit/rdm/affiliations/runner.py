@@ -12,22 +12,38 @@ from pathlib import Path
 from invenio_rdm_migrator.streams import Stream
 
 from cds_migrator_kit.rdm.affiliations.log import AffiliationsLogger
+from cds_migrator_kit.rdm.affiliations.ror_cache import RORCache
 
 
 class RecordAffiliationsRunner:
     """ETL streams runner."""
 
-    def __init__(self, stream_definition, filepath, log_dir, dry_run):
-        """Constructor."""
+    def __init__(
+        self,
+        stream_definition,
+        filepath,
+        log_dir,
+        dry_run,
+        ror_cache_path=None,
+        offline=False,
+    ):
+        """Constructor.
+
+        :param ror_cache_path: path of the ROR cache, no cache if None.
+        :param offline: do not query ROR, only use the cache.
+        """
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
         AffiliationsLogger.initialize(self.log_dir)
 
+        self.ror_cache = RORCache(ror_cache_path) if ror_cache_path else None
         self.stream = Stream(
             stream_definition.name,
             extract=stream_definition.extract_cls(filepath),
-            transform=stream_definition.transform_cls(),
+            transform=stream_definition.transform_cls(
+                ror_cache=self.ror_cache, offline=offline
+            ),
             load=stream_definition.load_cls(dry_run=dry_run),
         )
 
@@ -39,3 +55,9 @@ class RecordAffiliationsRunner:
             AffiliationsLogger.get_logger().exception(
                 f"Stream {self.stream.name} failed.", exc_info=1
             )
+        finally:
+            if self.ror_cache:
+                AffiliationsLogger.get_logger().warning(
+                    f"ROR cache: {self.ror_cache.stats}"
+                )
+                self.ror_cache.close()
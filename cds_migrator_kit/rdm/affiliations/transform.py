@@ -19,10 +19,16 @@ from . import affiliations_migrator_marc21
 cli_logger = logging.getLogger("migrator")
 
 
-def affiliations_search(affiliation_name):
-    """Query ROR organizations API to normalize affiliations."""
+def affiliations_search(affiliation_name, cache=None, offline=False, session=None):
+    """Query ROR organizations API to normalize affiliations.
 
-    def get_ror_affiliation(affiliation):
+    :param cache: ``RORCache`` of the previous queries.
+    :param offline: only look the affiliation up in the cache, the API
+                    responses then the names seeded from a ROR dump.
+    :param session: requests session to query the API with.
+    """
+
+    def get_ror_items(affiliation):
         """Query ROR organizations API to normalize affiliations."""
         assert affiliation
 
@@ -30,22 +36,30 @@ def affiliations_search(affiliation_name):
         params = {"affiliation": affiliation}
 
         try:
-            response = requests.get(url, params=params)
+            response = (session or requests).get(url, params=params)
             response.raise_for_status()
-            items = response.json().get("items")
-            if items:
-                for item in items:
-                    if item["chosen"] is True:
-                        return (True, item)
-            return (False, items)
+            return response.json().get("items") or []
         except requests.exceptions.HTTPError as http_err:
             cli_logger.exception(http_err)
         except Exception as err:
             cli_logger.exception(err)
 
-    (chosen, affiliation) = get_ror_affiliation(affiliation_name)
+    items = None
+    if cache:
+        items = cache.get(affiliation_name, expire=not offline)
+    if items is None and not offline:
+        items = get_ror_items(affiliation_name)
+        if cache and items is not None:
+            cache.set(affiliation_name, items)
+    if items is None and cache:
+        # offline or the API did not answer
+        items = cache.get_seeded(affiliation_name)
 
-    return (chosen, affiliation)
+    if items:
+        for item in items:
+            if item["chosen"] is True:
+                return (True, item)
+    return (False, items)
 
 
 class CDSToRDMAffiliationTransform(RDMRecordTransform):
@@ -54,9 +68,18 @@ class CDSToRDMAffiliationTransform(RDMRecordTransform):
     def __init__(
         self,
         dry_run=False,
+        ror_cache=None,
+        offline=False,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param ror_cache: ``RORCache`` of the ROR queries.
+        :param offline: do not query ROR, only use the cache.
+        """
         self.dry_run = dry_run
+        self.ror_cache = ror_cache
+        self.offline = offline
+        self.session = requests.Session()
         super().__init__()
 
     def _affiliations(self, json_entry, key):
@@ -75,7 +98,12 @@ class CDSToRDMAffiliationTransform(RDMRecordTransform):
                     "original_input": affiliation_name,
                 }
 
-                (chosen, match_or_suggestions) = affiliations_search(affiliation_name)
+                (chosen, match_or_suggestions) = affiliations_search(
+                    affiliation_name,
+                    cache=self.ror_cache,
+                    offline=self.offline,
+                    session=self.session,
+                )
 
                 if chosen:
                     _affiliation.update(
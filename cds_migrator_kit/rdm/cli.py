@@ -6,6 +6,7 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM command line module."""
+
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -14,13 +15,17 @@ import click
 from flask import current_app
 from flask.cli import with_appcontext
 
+from cds_migrator_kit.rdm.affiliations.ror_cache import RORCache
 from cds_migrator_kit.rdm.affiliations.runner import RecordAffiliationsRunner
 from cds_migrator_kit.rdm.affiliations.streams import AffiliationsStreamDefinition
 from cds_migrator_kit.rdm.records.streams import (  # UserStreamDefinition,
     RecordStreamDefinition,
 )
 from cds_migrator_kit.rdm.stats.runner import RecordStatsRunner
-from cds_migrator_kit.rdm.stats.streams import RecordStatsStreamDefinition
+from cds_migrator_kit.rdm.stats.streams import (
+    RecordStatsAsyncStreamDefinition,
+    RecordStatsStreamDefinition,
+)
 from cds_migrator_kit.rdm.users.runner import PeopleAuthorityRunner, SubmitterRunner
 from cds_migrator_kit.rdm.users.streams import (
     SubmitterStreamDefinition,
@@ -50,8 +55,49 @@ def migration():
     help="Collection name to be migrated",
     required=True,
 )
+@click.option(
+    "--stream-parse",
+    is_flag=True,
+    help="Parse the record dumps incrementally instead of loading them in memory.",
+)
+@click.option(
+    "--checkpoint",
+    is_flag=True,
+    help="Save the progress of the run after every loaded record (implies "
+    "--stream-parse).",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted run after the last loaded record.",
+)
+@click.option(
+    "--pipelined",
+    is_flag=True,
+    help="Run the extract, transform and load steps concurrently.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Write a report of the time spent per record and per stage.",
+)
+@click.option(
+    "--profile-slowest",
+    default=0,
+    type=int,
+    help="Keep a cProfile capture of the N slowest records (implies --profile).",
+)
 @with_appcontext
-def run(collection, dry_run=False):
+def run(
+    collection,
+    dry_run=False,
+    stream_parse=False,
+    checkpoint=False,
+    resume=False,
+    pipelined=False,
+    profile=False,
+    profile_slowest=0,
+):
     """Run."""
     stream_config = current_app.config["CDS_MIGRATOR_KIT_STREAM_CONFIG"]
     runner = Runner(
@@ -60,6 +106,12 @@ def run(collection, dry_run=False):
         config_filepath=Path(stream_config).absolute(),
         dry_run=dry_run,
         collection=collection,
+        stream_parse=stream_parse,
+        checkpoint=checkpoint,
+        resume=resume,
+        pipelined=pipelined,
+        profile=profile or bool(profile_slowest),
+        profile_slowest=profile_slowest,
     )
     runner.run()
 
@@ -84,17 +136,35 @@ def stats():
     default=lambda: datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
     help="ISO string e.g 2024-12-13T20:00:00 to migrate events up to this date.",
 )
+@click.option(
+    "--concurrency",
+    type=int,
+    default=1,
+    help="Number of records whose statistics are migrated concurrently.",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    help="Number of records whose legacy events are searched in one query.",
+)
 @with_appcontext
-def run(filepath, less_than_date, dry_run=False):
+def run(filepath, less_than_date, dry_run=False, concurrency=1, batch_size=None):
     """Migrate the legacy statistics for the records in `filepath`."""
     stream_config = current_app.config["CDS_MIGRATOR_KIT_RECORD_STATS_STREAM_CONFIG"]
+    stream_config["CONCURRENCY"] = concurrency
+    if batch_size:
+        stream_config["SRC_SEARCH_BATCH_SIZE"] = batch_size
     stream_config["DEST_SEARCH_INDEX_PREFIX"] = (
         f"{current_app.config['SEARCH_INDEX_PREFIX']}events-stats"
     )
     stream_config["DEST_SEARCH_HOSTS"] = current_app.config["SEARCH_HOSTS"]
     log_dir = Path(current_app.config["CDS_MIGRATOR_KIT_LOGS_PATH"]) / "stats"
     runner = RecordStatsRunner(
-        stream_definition=RecordStatsStreamDefinition,
+        stream_definition=(
+            RecordStatsAsyncStreamDefinition
+            if concurrency > 1
+            else RecordStatsStreamDefinition
+        ),
         filepath=filepath,
         config=stream_config,
         less_than_date=less_than_date,
@@ -176,8 +246,13 @@ def affiliations():
     "--filepath",
     help="Path to the list of records file that the legacy statistics will be migrated.",
 )
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Match the affiliations with the ROR cache only, without querying ROR.",
+)
 @with_appcontext
-def affiliations_run(filepath, dry_run=False):
+def affiliations_run(filepath, dry_run=False, offline=False):
     """Migrate the legacy statistics for the records in `filepath`."""
     log_dir = Path(current_app.config["CDS_MIGRATOR_KIT_LOGS_PATH"]) / "affiliations"
     runner = RecordAffiliationsRunner(
@@ -185,10 +260,30 @@ def affiliations_run(filepath, dry_run=False):
         filepath=filepath,
         log_dir=log_dir,
         dry_run=dry_run,
+        ror_cache_path=current_app.config["CDS_MIGRATOR_KIT_ROR_CACHE_PATH"],
+        offline=offline,
     )
     runner.run()
 
 
+@affiliations.command()
+@click.option(
+    "--filepath",
+    help="Path to the ROR data dump (JSON or zip file).",
+    required=True,
+)
+@with_appcontext
+def seed_ror_cache(filepath):
+    """Seed the ROR cache with the organizations of a ROR data dump."""
+    cache_path = current_app.config["CDS_MIGRATOR_KIT_ROR_CACHE_PATH"]
+    cache = RORCache(cache_path)
+    try:
+        count = cache.import_dump(filepath)
+    finally:
+        cache.close()
+    click.secho(f"{count} organizations imported in {cache_path}.", fg="green")
+
+
 @migration.group()
 def community():
     """Create and dump community id in streams.yaml."""
@@ -337,6 +337,9 @@ CDS_MIGRATOR_KIT_LOGS_PATH = (
     os.environ.get("INVENIO_CDS_MIGRATOR_KIT_LOGS_PATH") or logs_dir
 )
 
+CDS_MIGRATOR_KIT_ROR_CACHE_PATH = os.path.join(
+    CDS_MIGRATOR_KIT_LOGS_PATH, "affiliations", "ror_cache.db"
+)
 
 CDS_MIGRATOR_KIT_STREAM_CONFIG = "cds_migrator_kit/rdm/streams.yaml"
 
@@ -440,5 +443,9 @@ CDS_MIGRATOR_KIT_RECORD_STATS_STREAM_CONFIG = dict(
     ),
     SRC_SEARCH_SIZE=5000,
     SRC_SEARCH_SCROLL="1h",
+    # records whose events are searched with one query, 1 for a query per record
+    SRC_SEARCH_BATCH_SIZE=1,
+    # records whose migrated counts are validated together
+    VALIDATION_BATCH_SIZE=1000,
 )
 """Config for record statistics migration."""
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration concurrent file ingest."""
+
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+CHUNK_SIZE = 1024 * 1024
+
+PLACEMENTS = ("stream", "link", "move")
+
+
+def file_md5(filepath):
+    """Compute the MD5 of a file, as ``md5:<hex>``."""
+    md5 = hashlib.md5()
+    with open(filepath, "rb") as fp:
+        for chunk in iter(lambda: fp.read(CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return f"md5:{md5.hexdigest()}"
+
+
+def place_file(source, target, mode):
+    """Hard-link or move a file to its storage location, without copying it.
+
+    Both paths have to be on the same filesystem.
+
+    :param target: path or ``file://`` URI of the storage location.
+    :param mode: ``link`` or ``move``.
+    """
+    if target.startswith("file://"):
+        target = target[len("file://") :]
+    if "://" in target:
+        raise ValueError(f"{target} is not on a mounted filesystem")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if mode == "link":
+        os.link(source, target)
+    elif mode == "move":
+        os.rename(source, target)
+    else:
+        raise ValueError(f"Unknown file placement: {mode}")
+
+
+class StagedFile:
+    """Legacy file streamed to a local buffer, with its checksum."""
+
+    def __init__(self, stream, checksum, size):
+        """Constructor.
+
+        :param stream: buffer with the content, at position 0.
+        :param checksum: MD5 of the content, as ``md5:<hex>``.
+        :param size: size of the content in bytes.
+        """
+        self.stream = stream
+        self.checksum = checksum
+        self.size = size
+
+    def close(self):
+        """Release the buffer."""
+        self.stream.close()
+
+
+class FileIngest:
+    """Stream the legacy files of a draft concurrently.
+
+    The files are read by a pool of threads into local buffers (in memory up
+    to ``spool_size``, on disk above) while their MD5 is computed. The buffers
+    are handed back in the order of the files, so that they are stored and
+    committed by the loader thread, which owns the database session. At most
+    ``byte_budget`` bytes are read ahead of the file being stored.
+    """
+
+    def __init__(
+        self,
+        opener,
+        workers=4,
+        byte_budget=512 * 1024 * 1024,
+        spool_size=16 * 1024 * 1024,
+        tmp_dir=None,
+    ):
+        """Constructor.
+
+        :param opener: callable opening a legacy file path in binary mode.
+        :param workers: number of files read concurrently.
+        :param byte_budget: maximum number of bytes read ahead.
+        :param spool_size: size above which the buffers are written to disk.
+        :param tmp_dir: directory of the buffers written to disk.
+        """
+        self.opener = opener
+        self.workers = workers
+        self.byte_budget = byte_budget
+        self.spool_size = spool_size
+        self.tmp_dir = tmp_dir
+
+    def _stage(self, filepath):
+        """Read a legacy file into a local buffer, computing its MD5."""
+        md5 = hashlib.md5()
+        size = 0
+        staged = SpooledTemporaryFile(max_size=self.spool_size, dir=self.tmp_dir)
+        try:
+            with self.opener(filepath) as source:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    md5.update(chunk)
+                    staged.write(chunk)
+                    size += len(chunk)
+            staged.seek(0)
+        except Exception:
+            staged.close()
+            raise
+        return StagedFile(staged, f"md5:{md5.hexdigest()}", size)
+
+    @staticmethod
+    def _size(filepath):
+        try:
+            return os.path.getsize(filepath)
+        except OSError:
+            # the error is raised when the file is read
+            return 0
+
+    def stream(self, files):
+        """Yield the file data and the future of its staged file, in order.
+
+        The future raises the error of the file read, if any. The caller
+        closes the staged files. If it stops iterating, the files read ahead
+        are dropped.
+
+        :param files: list of file data with the legacy ``eos_tmp_path``.
+        """
+        files = iter(files)
+        pending = deque()
+        reserved = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                next_file = next(files, None)
+                while next_file is not None or pending:
+                    # read ahead as long as the budget allows, or the next file
+                    # alone if it is bigger than the budget
+                    while next_file is not None and len(pending) < 2 * self.workers:
+                        size = self._size(next_file["eos_tmp_path"])
+                        if pending and reserved + size > self.byte_budget:
+                            break
+                        future = executor.submit(self._stage, next_file["eos_tmp_path"])
+                        pending.append((next_file, size, future))
+                        reserved += size
+                        next_file = next(files, None)
+
+                    file_data, size, future = pending.popleft()
+                    reserved -= size
+                    yield file_data, future
+            finally:
+                for _, _, future in pending:
+                    if not future.cancel() and not future.exception():
+                        future.result().close()
@@ -8,6 +8,7 @@
 """CDS-RDM migration load module."""
 import datetime
 import json
+import os
 from copy import deepcopy
 
 import arrow
@@ -17,15 +18,19 @@ from cds_rdm.legacy.resolver import get_pid_by_legacy_recid
 from cds_rdm.minters import legacy_recid_minter
 from invenio_access.permissions import system_identity
 from invenio_db import db
+from invenio_files_rest.models import FileInstance, ObjectVersion
 from invenio_pidstore.errors import PIDAlreadyExists
-from invenio_pidstore.models import PersistentIdentifier
 from invenio_rdm_migrator.load.base import Load
 from invenio_rdm_records.proxies import current_rdm_records_service
 from invenio_records.systemfields.relations import InvalidRelationValue
 from marshmallow import ValidationError
 
 from cds_migrator_kit.errors import CDSMigrationException, ManualImportRequired
+from cds_migrator_kit.legacy_recids import LegacyRecidIndex
 from cds_migrator_kit.reports.log import RDMJsonLogger
+from cds_migrator_kit.reports.profiler import profiler
+
+from .files import PLACEMENTS, FileIngest, file_md5, place_file
 
 
 def import_legacy_files(filepath):
@@ -45,11 +50,44 @@ class CDSRecordServiceLoad(Load):
         entries=None,
         dry_run=False,
         legacy_pids_to_redirect=None,
+        checkpoint=None,
+        file_workers=4,
+        file_byte_budget=512 * 1024 * 1024,
+        files_placement="stream",
+        files_verify_checksum=False,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param file_workers: number of legacy files of a draft read concurrently.
+        :param file_byte_budget: maximum number of bytes of legacy files read
+                                 ahead of the file being stored.
+        :param files_placement: ``stream`` the legacy files through the files
+                                service, or ``link``/``move`` them to the
+                                bucket location (same filesystem).
+        :param files_verify_checksum: read the placed files to verify their MD5,
+                                      only their size is verified otherwise.
+        """
+        if files_placement not in PLACEMENTS:
+            raise ValueError(f"Unknown files placement: {files_placement}")
         self.dry_run = dry_run
         self.legacy_pids_to_redirect = {}
         self.clc_sync = False
+        self.checkpoint = checkpoint
+        self.files_placement = files_placement
+        self.files_verify_checksum = files_verify_checksum
+        # staged files moved to the buckets of the record being loaded, the
+        # files of a version are carried over to the next ones
+        self._moved_files = set()
+        if tmp_dir:
+            # the legacy files above the spool size are buffered there
+            os.makedirs(tmp_dir, exist_ok=True)
+        self.file_ingest = FileIngest(
+            import_legacy_files,
+            workers=file_workers,
+            byte_budget=file_byte_budget,
+            tmp_dir=tmp_dir,
+        )
+        LegacyRecidIndex.load()
 
         if legacy_pids_to_redirect is not None:
             with open(legacy_pids_to_redirect, "r") as fp:
@@ -59,85 +97,142 @@ class CDSRecordServiceLoad(Load):
         """Prepare the record."""
         pass
 
+    @profiler.profiled("load_files")
     def _load_files(self, draft, entry, version_files):
         """Load files to draft."""
         recid = entry.get("record", {}).get("recid", {})
-        migration_logger = RDMJsonLogger()
         identity = system_identity  # Should we create an identity for the migration?
 
-        for filename, file_data in version_files.items():
+        if self.files_placement != "stream":
+            for file_data in version_files.values():
+                try:
+                    self._place_file(identity, draft, recid, file_data)
+                except Exception as e:
+                    self._log_file_error(e, entry, recid, file_data)
+                    raise e
+            return
+
+        staged_files = self.file_ingest.stream(version_files.values())
+        try:
+            for file_data, future in staged_files:
+                try:
+                    staged = future.result()
+                    try:
+                        self._load_file(identity, draft, recid, file_data, staged)
+                    finally:
+                        staged.close()
+                except Exception as e:
+                    self._log_file_error(e, entry, recid, file_data)
+                    raise e
+        finally:
+            staged_files.close()
+
+    @staticmethod
+    def _log_file_error(e, entry, recid, file_data):
+        exc = ManualImportRequired(
+            recid=recid,
+            message=str(e),
+            field="filename",
+            value=file_data["key"],
+            stage="file load",
+            priority="critical",
+        )
+        RDMJsonLogger().add_log(exc, record=entry)
+
+    def _init_file(self, identity, draft, recid, file_data):
+        """Reserve the file of the draft."""
+        current_rdm_records_service.draft_files.init_files(
+            identity,
+            draft.id,
+            data=[
+                {
+                    "key": file_data["key"],
+                    "metadata": {
+                        **file_data["metadata"],
+                        "legacy_file_id": file_data["id_bibdoc"],
+                        "legacy_recid": recid,
+                    },
+                    "access": {"hidden": False},
+                }
+            ],
+        )
 
-            file_data = version_files[filename]
+    @staticmethod
+    def _checksum_error(recid, file_data, checksum):
+        legacy_checksum = f"md5:{file_data['checksum']}"
+        return ManualImportRequired(
+            message=f"Files checksum failed legacy:{legacy_checksum} calculated new: {checksum}",
+            field="checksum",
+            stage="load",
+            recid=recid,
+            priority="critical",
+            value=file_data["key"],
+            subfield=None,
+        )
 
-            try:
-                current_rdm_records_service.draft_files.init_files(
-                    identity,
-                    draft.id,
-                    data=[
-                        {
-                            "key": file_data["key"],
-                            "metadata": {
-                                **file_data["metadata"],
-                                "legacy_file_id": file_data["id_bibdoc"],
-                                "legacy_recid": recid,
-                            },
-                            "access": {"hidden": False},
-                        }
-                    ],
-                )
-                # TODO change to eos move or xrootd command instead of going through the app
-                # TODO leave the init part to pre-create the destination folder
-                # TODO update checksum, size, commit (to be checked on how these methods work)
-                # if current_app.config["XROOTD_ENABLED"]:
-                #     storage = current_files_rest.storage_factory
-                #     current_rdm_records_service.draft_files.set_file_content(
-                #         identity,
-                #         draft.id,
-                #         file["key"],
-                #         BytesIO(b"Placeholder file"),
-                #     )
-                #     obj = None
-                #     for object in draft._record.files.objects:
-                #         if object.key == file["key"]:
-                #             obj = object
-                #     path = obj.file.uri
-                # else:
-                # for local development
-                current_rdm_records_service.draft_files.set_file_content(
-                    identity,
-                    draft.id,
-                    file_data["key"],
-                    import_legacy_files(file_data["eos_tmp_path"]),
-                )
-                result = current_rdm_records_service.draft_files.commit_file(
-                    identity, draft.id, file_data["key"]
-                )
-                legacy_checksum = f"md5:{file_data['checksum']}"
-                new_checksum = result.to_dict()["checksum"]
-                try:
-                    assert legacy_checksum == new_checksum
-                except AssertionError:
-                    raise ManualImportRequired(
-                        message=f"Files checksum failed legacy:{legacy_checksum} calculated new: {new_checksum}",
-                        field="checksum",
-                        stage="load",
-                        recid=recid,
-                        priority="critical",
-                        value=file_data["key"],
-                        subfield=None,
-                    )
+    def _load_file(self, identity, draft, recid, file_data, staged):
+        """Store and commit a staged file to the draft."""
+        # verified on the streamed content, before storing it
+        if f"md5:{file_data['checksum']}" != staged.checksum:
+            raise self._checksum_error(recid, file_data, staged.checksum)
+        self._init_file(identity, draft, recid, file_data)
+        current_rdm_records_service.draft_files.set_file_content(
+            identity,
+            draft.id,
+            file_data["key"],
+            staged.stream,
+            content_length=staged.size,
+        )
+        current_rdm_records_service.draft_files.commit_file(
+            identity, draft.id, file_data["key"]
+        )
 
-            except Exception as e:
-                exc = ManualImportRequired(
-                    recid=recid,
-                    message=str(e),
-                    field="filename",
-                    value=file_data["key"],
-                    stage="file load",
-                    priority="critical",
-                )
-                migration_logger.add_log(exc, record=entry)
-                raise e
+    def _place_file(self, identity, draft, recid, file_data):
+        """Link or move a legacy file to the bucket of the draft and commit it.
+
+        The file instance is created with the legacy size and checksum, the
+        content does not go through the files service.
+        """
+        source = str(file_data["eos_tmp_path"])
+        legacy_checksum = f"md5:{file_data['checksum']}"
+        size = os.path.getsize(source)
+        if size != int(file_data["size"]):
+            raise ManualImportRequired(
+                message=f"Files size failed legacy:{file_data['size']} found: {size}",
+                field="size",
+                stage="load",
+                recid=recid,
+                priority="critical",
+                value=file_data["key"],
+                subfield=None,
+            )
+        if self.files_verify_checksum:
+            checksum = file_md5(source)
+            if checksum != legacy_checksum:
+                raise self._checksum_error(recid, file_data, checksum)
+
+        self._init_file(identity, draft, recid, file_data)
+        bucket = draft._record.bucket
+        file_instance = FileInstance.create()
+        # the location the storage would have written the file to
+        target = file_instance.storage(
+            default_location=bucket.location.uri,
+            default_storage_class=bucket.default_storage_class,
+        ).fileurl
+        # a move is a link until the record is loaded, for the retries
+        place_file(source, target, "link")
+        if self.files_placement == "move":
+            self._moved_files.add(source)
+        file_instance.set_uri(
+            target,
+            size,
+            legacy_checksum,
+            storage_class=bucket.default_storage_class,
+        )
+        ObjectVersion.create(bucket, file_data["key"]).set_file(file_instance)
+        current_rdm_records_service.draft_files.commit_file(
+            identity, draft.id, file_data["key"]
+        )
 
     def _load_parent_access(self, draft, entry):
         """Load access rights."""
@@ -221,6 +316,7 @@ class CDSRecordServiceLoad(Load):
             )
             file.commit()
 
+    @profiler.profiled("after_publish")
     def _after_publish(self, identity, published_record, entry, version):
         """Run fixes after record publish."""
         self._after_publish_update_dois(identity, published_record, entry)
@@ -229,6 +325,7 @@ class CDSRecordServiceLoad(Load):
         self._after_publish_update_files_created(published_record, entry, version)
         db.session.commit()
 
+    @profiler.profiled("pre_publish")
     def _pre_publish(self, identity, entry, version, draft):
         """Create and process draft before publish."""
         versions = entry["versions"]
@@ -409,17 +506,15 @@ class CDSRecordServiceLoad(Load):
 
     def _have_migrated_recid(self, recid):
         """Check if we have minted `lrecid` pid."""
-        pid = PersistentIdentifier.query.filter_by(
-            pid_type="lrecid",
-            pid_value=recid,
-        ).one_or_none()
-        return pid is not None
+        return LegacyRecidIndex.contains(recid)
 
     def _should_skip_recid(self, recid):
         """Check if recid should be skipped."""
-        if recid in self.legacy_pids_to_redirect or self._have_migrated_recid(recid):
+        if recid in self.legacy_pids_to_redirect:
             return True
-        return False
+        if self.checkpoint and self.checkpoint.status(recid) == "migrated":
+            return True
+        return self._have_migrated_recid(recid)
 
     def _after_load_clc_sync(self, record_state):
         if self.clc_sync:
@@ -441,51 +536,79 @@ class CDSRecordServiceLoad(Load):
 
             recid = entry.get("record", {}).get("recid", {})
 
-            if self._should_skip_recid(recid):
-                return
+            with profiler.record(recid, "load"):
+                if self._should_skip_recid(recid):
+                    self._checkpoint(recid, "skipped")
+                    return
 
-            migration_logger = RDMJsonLogger()
-            try:
-                if self.dry_run:
-                    self._dry_load(entry)
-                else:
-                    recid_state_after_load = self._load_versions(
-                        entry, migration_logger
-                    )
-                    if recid_state_after_load:
-                        self._save_original_dumped_record(
-                            entry, recid_state_after_load, migration_logger
+                migration_logger = RDMJsonLogger()
+                status = "failed"
+                self._moved_files = set()
+                try:
+                    if self.dry_run:
+                        self._dry_load(entry)
+                    else:
+                        recid_state_after_load = self._load_versions(
+                            entry, migration_logger
                         )
-                        self._after_load_clc_sync(recid_state_after_load)
-                migration_logger.add_success(recid)
-            except ManualImportRequired as e:
-                migration_logger.add_log(e, record=entry)
-            except PIDAlreadyExists as e:
-                # TODO remove when there is a way of cleaning local environment from
-                # previous run of migration
-                exc = ManualImportRequired(
-                    message=str(e),
-                    field="validation",
-                    stage="load",
-                    description="RECORD Already exists.",
-                    recid=recid,
-                    priority="warning",
-                    value=e.pid_value,
-                    subfield="PID",
-                )
-                migration_logger.add_log(exc, record=entry)
-            except (CDSMigrationException, ValidationError, InvalidRelationValue) as e:
-                exc = ManualImportRequired(
-                    message=str(e),
-                    field="validation",
-                    stage="load",
-                    recid=recid,
-                    priority="warning",
-                )
-                migration_logger.add_log(exc, record=entry)
+                        LegacyRecidIndex.add(recid)
+                        if recid_state_after_load:
+                            self._save_original_dumped_record(
+                                entry, recid_state_after_load, migration_logger
+                            )
+                            self._after_load_clc_sync(recid_state_after_load)
+                    migration_logger.add_success(recid)
+                    status = "dry_run" if self.dry_run else "migrated"
+                    self._remove_moved_files()
+                except ManualImportRequired as e:
+                    migration_logger.add_log(e, record=entry)
+                except PIDAlreadyExists as e:
+                    # TODO remove when there is a way of cleaning local environment from
+                    # previous run of migration
+                    exc = ManualImportRequired(
+                        message=str(e),
+                        field="validation",
+                        stage="load",
+                        description="RECORD Already exists.",
+                        recid=recid,
+                        priority="warning",
+                        value=e.pid_value,
+                        subfield="PID",
+                    )
+                    migration_logger.add_log(exc, record=entry)
+                except (
+                    CDSMigrationException,
+                    ValidationError,
+                    InvalidRelationValue,
+                ) as e:
+                    exc = ManualImportRequired(
+                        message=str(e),
+                        field="validation",
+                        stage="load",
+                        recid=recid,
+                        priority="warning",
+                    )
+                    migration_logger.add_log(exc, record=entry)
+                self._checkpoint(recid, status)
+
+    def _remove_moved_files(self):
+        """Remove the staged files moved to the buckets of the loaded record."""
+        for source in self._moved_files:
+            try:
+                os.unlink(source)
+            except FileNotFoundError:
+                pass
+        self._moved_files = set()
+
+    def _checkpoint(self, recid, status):
+        """Save the progress of the run after a record is processed."""
+        if self.checkpoint:
+            self.checkpoint.loaded(recid, status)
 
     def _cleanup(self, *args, **kwargs):
         """Post migration process."""
+        if self.checkpoint:
+            self.checkpoint.flush()
         migration_logger = RDMJsonLogger()
         for legacy_src_pid, legacy_dest_pid in self.legacy_pids_to_redirect.items():
             if self._have_migrated_recid(legacy_src_pid):
@@ -495,6 +618,7 @@ class CDSRecordServiceLoad(Load):
                 assert str(parent_dest_pid.status) == "R"
                 legacy_recid_minter(legacy_src_pid, parent_dest_pid.object_uuid)
                 db.session.commit()
+                LegacyRecidIndex.add(legacy_src_pid)
                 migration_logger.add_success(legacy_src_pid)
             except Exception as exc:
                 db.session.rollback()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM transform caches module."""
+
+from collections import OrderedDict, namedtuple
+
+from invenio_access.permissions import system_identity
+from invenio_db import db
+from invenio_records_resources.proxies import current_service_registry
+from opensearchpy import RequestError
+
+from cds_migrator_kit.errors import UnexpectedValue
+
+AffiliationMapping = namedtuple(
+    "AffiliationMapping",
+    ["curated_affiliation", "ror_exact_match", "ror_not_exact_match"],
+)
+
+
+class AffiliationMappingCache:
+    """Cache of the affiliation mapping table.
+
+    Entries are looked up lazily and kept for the lifetime of the cache,
+    unknown affiliations included. Once warmed, the whole table is in memory
+    and the database is not queried anymore.
+    """
+
+    def __init__(self, model):
+        """Constructor.
+
+        :param model: affiliation mapping db model.
+        """
+        self.model = model
+        self._mappings = {}
+        self._complete = False
+        self.hits = 0
+        self.misses = 0
+
+    def _to_mapping(self, row):
+        return AffiliationMapping(
+            curated_affiliation=row.curated_affiliation,
+            ror_exact_match=row.ror_exact_match,
+            ror_not_exact_match=row.ror_not_exact_match,
+        )
+
+    def warm(self):
+        """Load the whole mapping table."""
+        query = db.session.query(
+            self.model.legacy_affiliation_input,
+            self.model.curated_affiliation,
+            self.model.ror_exact_match,
+            self.model.ror_not_exact_match,
+        )
+        self._mappings = {
+            row.legacy_affiliation_input: self._to_mapping(row)
+            for row in query.yield_per(1000)
+        }
+        self._complete = True
+
+    def invalidate(self):
+        """Drop all the cached entries."""
+        self._mappings = {}
+        self._complete = False
+
+    def get(self, legacy_affiliation_input):
+        """Return the mapping of a legacy affiliation or None if not mapped."""
+        if legacy_affiliation_input in self._mappings or self._complete:
+            self.hits += 1
+            return self._mappings.get(legacy_affiliation_input)
+        self.misses += 1
+        match = self.model.query.filter_by(
+            legacy_affiliation_input=legacy_affiliation_input
+        ).one_or_none()
+        mapping = self._to_mapping(match) if match else None
+        self._mappings[legacy_affiliation_input] = mapping
+        return mapping
+
+    @property
+    def stats(self):
+        """Return the cache usage counters."""
+        return {
+            "size": len(self._mappings),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def search_vocabulary(term, vocab_type):
+    """Search vocabulary utility function."""
+    service = current_service_registry.get("vocabularies")
+    if "/" in term:
+        # escape the slashes
+        term = f'"{term}"'
+    try:
+        vocabulary_result = service.search(
+            system_identity, type=vocab_type, q=f"{term}"
+        ).to_dict()
+        return vocabulary_result
+    except RequestError:
+        raise UnexpectedValue(
+            subfield="a",
+            value=term,
+            field=vocab_type,
+            message=f"Vocabulary {vocab_type} term {term} not valid search phrase.",
+            stage="vocabulary match",
+        )
+
+
+class VocabularyResolver:
+    """Resolve legacy terms to vocabulary ids.
+
+    Resolved terms are kept in a LRU cache, terms without a match included.
+    The ids of whole vocabulary types can be preloaded, in which case a term
+    equal to an id is resolved without searching.
+    """
+
+    def __init__(self, maxsize=10000, preload_types=None):
+        """Constructor.
+
+        :param maxsize: maximum number of cached terms.
+        :param preload_types: vocabulary types to preload the ids of.
+        """
+        self.maxsize = maxsize
+        self.preload_types = preload_types or []
+        self._terms = OrderedDict()
+        self._preloaded = {}
+        self.hits = 0
+        self.misses = 0
+
+    def preload(self):
+        """Load the ids of the configured vocabulary types."""
+        service = current_service_registry.get("vocabularies")
+        for vocab_type in self.preload_types:
+            result = service.read_all(
+                system_identity, fields=["id"], type=vocab_type, cache=False
+            ).to_dict()
+            self._preloaded[vocab_type] = {
+                hit["id"].lower(): hit["id"] for hit in result["hits"]["hits"]
+            }
+
+    def invalidate(self):
+        """Drop all the cached terms."""
+        self._terms.clear()
+        self._preloaded = {}
+
+    def resolve(self, term, vocab_type):
+        """Return the id of the first vocabulary entry matching term or None."""
+        key = (vocab_type, term)
+        if key in self._terms:
+            self.hits += 1
+            self._terms.move_to_end(key)
+            return self._terms[key]
+        preloaded_id = self._preloaded.get(vocab_type, {}).get(term.strip().lower())
+        if preloaded_id:
+            self.hits += 1
+            return preloaded_id
+
+        self.misses += 1
+        result = search_vocabulary(term, vocab_type)
+        vocabulary_id = None
+        if result["hits"]["total"]:
+            vocabulary_id = result["hits"]["hits"][0]["id"]
+        self._terms[key] = vocabulary_id
+        if len(self._terms) > self.maxsize:
+            self._terms.popitem(last=False)
+        return vocabulary_id
+
+    @property
+    def stats(self):
+        """Return the cache usage counters."""
+        return {
+            "size": len(self._terms),
+            "preloaded": sum(len(ids) for ids in self._preloaded.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
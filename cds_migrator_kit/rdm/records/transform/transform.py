@@ -9,24 +9,19 @@
 import datetime
 import logging
 from collections import OrderedDict
-from copy import deepcopy
 from pathlib import Path
 
 import arrow
 from cds_rdm.legacy.models import CDSMigrationAffiliationMapping
 from idutils import normalize_ror
 from idutils.validators import is_doi, is_ror
-from invenio_access.permissions import system_identity
-from invenio_accounts.models import User, UserIdentity
+from invenio_accounts.models import UserIdentity
 from invenio_db import db
 from invenio_rdm_migrator.streams.records.transform import (
     RDMRecordEntry,
     RDMRecordTransform,
 )
-from invenio_records_resources.proxies import current_service_registry
 from invenio_vocabularies.contrib.names.models import NamesMetadata
-from opensearchpy import RequestError
-from sqlalchemy.exc import NoResultFound
 
 from cds_migrator_kit.errors import (
     ManualImportRequired,
@@ -39,6 +34,10 @@ from cds_migrator_kit.rdm.migration_config import (
     RDM_RECORDS_IDENTIFIERS_SCHEMES,
     VOCABULARIES_NAMES_SCHEMES,
 )
+from cds_migrator_kit.rdm.records.transform.cache import (
+    AffiliationMappingCache,
+    VocabularyResolver,
+)
 from cds_migrator_kit.rdm.records.transform.config import (
     FILE_SUBFORMATS_TO_DROP,
     IDENTIFIERS_SCHEMES_TO_DROP,
@@ -47,33 +46,16 @@ from cds_migrator_kit.rdm.records.transform.config import (
     PIDS_SCHEMES_TO_DROP,
 )
 from cds_migrator_kit.reports.log import RDMJsonLogger
+from cds_migrator_kit.reports.profiler import profiler
+from cds_migrator_kit.transform import migrator_marc21
 from cds_migrator_kit.transform.dumper import CDSRecordDump
 from cds_migrator_kit.transform.errors import LossyConversion
+from cds_migrator_kit.transform.pool import MultiProcessTransformMixin
+from cds_migrator_kit.users.owners import owners
 
 cli_logger = logging.getLogger("migrator")
 
 
-def search_vocabulary(term, vocab_type):
-    """Search vocabulary utility function."""
-    service = current_service_registry.get("vocabularies")
-    if "/" in term:
-        # escape the slashes
-        term = f'"{term}"'
-    try:
-        vocabulary_result = service.search(
-            system_identity, type=vocab_type, q=f"{term}"
-        ).to_dict()
-        return vocabulary_result
-    except RequestError:
-        raise UnexpectedValue(
-            subfield="a",
-            value=term,
-            field=vocab_type,
-            message=f"Vocabulary {vocab_type} term {term} not valid search phrase.",
-            stage="vocabulary match",
-        )
-
-
 class CDSToRDMRecordEntry(RDMRecordEntry):
     """Transform CDS record to RDM record."""
 
@@ -83,12 +65,14 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
         missing_users_dir=None,
         missing_users_filename="people.csv",
         affiliations_mapping=None,
+        vocabularies=None,
         dry_run=False,
     ):
         """Constructor."""
         self.missing_users_dir = missing_users_dir
         self.missing_users_filename = missing_users_filename
         self.affiliations_mapping = affiliations_mapping
+        self.vocabularies = vocabularies
         self.dry_run = dry_run
         super().__init__(partial)
 
@@ -143,7 +127,7 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
         DATACITE_PREFIX = current_app.config["DATACITE_PREFIX"]
 
         pids = json_entry.get("_pids", {})
-        output_pids = deepcopy(pids)
+        output_pids = dict(pids)
         for key, identifier in pids.items():
             # ignoring some pids
             if key.upper() in PIDS_SCHEMES_TO_DROP:
@@ -162,7 +146,7 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 # assume it is DOI
                 key = "DOI"
             if key.upper() == "DOI":
-                doi_identifier = deepcopy(identifier)
+                doi_identifier = dict(identifier)
                 if identifier["identifier"].startswith(DATACITE_PREFIX):
                     if not json_entry.get("publisher"):
                         json_entry["publisher"] = "CERN"
@@ -188,10 +172,8 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
         email = json_entry.get("submitter")
         if not email:
             return "system"
-        try:
-            user = User.query.filter_by(email=email).one()
-            return user.id
-        except NoResultFound:
+        user_id = owners.get(email)
+        if user_id is None:
             return UnexpectedValue(
                 message=f"{email} not found - did you run user migration?",
                 stage="transform",
@@ -199,19 +181,19 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 value=email,
                 priority="critical",
             )
+        return user_id
 
     def _match_affiliation(self, affiliation_name):
         """Match an affiliation against `CDSMigrationAffiliationMapping` db table."""
         if is_ror(affiliation_name):
             return {"id": normalize_ror(affiliation_name)}
         # Step 1: search in the affiliation mapping (ROR organizations)
-        match = self.affiliations_mapping.query.filter_by(
-            legacy_affiliation_input=affiliation_name
-        ).one_or_none()
+        match = self.affiliations_mapping.get(affiliation_name)
         if match:
             # Step 1: check if there is a curated input
             if match.curated_affiliation:
-                return match.curated_affiliation
+                # the cached value is shared across records
+                return dict(match.curated_affiliation)
             # Step 2: check if there is an exact match
             elif match.ror_exact_match:
                 return {"id": normalize_ror(match.ror_exact_match)}
@@ -244,6 +226,43 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 stage="vocabulary match",
             )
 
+    def _lookup_person_names(self, creators):
+        """Look up the names vocabulary entries of the CERN person ids.
+
+        :returns: dict of person id to its names vocabulary entry.
+        """
+        person_ids = {
+            identifier.get("identifier")
+            for creator in creators
+            if creator
+            for identifier in creator.get("person_or_org", {}).get("identifiers", [])
+            if identifier["scheme"] == "cern"
+        }
+        person_ids.discard(None)
+        if not person_ids:
+            return {}
+        user_ids = dict(
+            db.session.query(UserIdentity.id, UserIdentity.id_user).filter(
+                UserIdentity.id.in_(person_ids)
+            )
+        )
+        if not user_ids:
+            return {}
+        names = NamesMetadata.query.filter(
+            NamesMetadata.internal_id.in_(
+                {str(user_id) for user_id in user_ids.values()}
+            )
+        )
+        listed_names = {}
+        for name in names:
+            if "unlisted" not in name.json.get("tags", []):
+                listed_names.setdefault(name.internal_id, name)
+        return {
+            person_id: listed_names[str(user_id)]
+            for person_id, user_id in user_ids.items()
+            if str(user_id) in listed_names
+        }
+
     def _metadata(self, json_entry, record_dump):
 
         def creator_affiliations(creator):
@@ -277,8 +296,8 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 inner_dict.pop("identifiers", None)
 
         def lookup_person_id(creator):
-            migrated_identifiers = deepcopy(
-                creator.get("person_or_org", {}).get("identifiers", [])
+            migrated_identifiers = creator.get("person_or_org", {}).get(
+                "identifiers", []
             )
             name = None
             # lookup person_id
@@ -291,20 +310,7 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 {},
             ).get("identifier")
             if person_id:
-                ui = UserIdentity.query.filter_by(id=person_id).one_or_none()
-                if ui:
-                    user_id = ui.user.id
-                    names = NamesMetadata.query.filter_by(
-                        internal_id=str(user_id)
-                    ).all()
-                    name = next(
-                        (
-                            name
-                            for name in names
-                            if "unlisted" not in name.json.get("tags", [])
-                        ),
-                        None,
-                    )
+                name = person_names.get(person_id)
             # filter out cern person_id
             creator["person_or_org"]["identifiers"] = [
                 identifier
@@ -321,8 +327,8 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
 
                 # copy names identifiers and json to assign explicitly json object
                 # due to how postgres assignment of json is handled
-                json_copy = deepcopy(name.json)
-                existing_ids = deepcopy(name.json["identifiers"])
+                json_copy = dict(name.json)
+                existing_ids = list(name.json["identifiers"])
                 # update the names vocab to contain other ids found during migration
                 for identifier in ids:
                     if identifier not in existing_ids:
@@ -333,11 +339,12 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 name.json = json_copy
 
                 db.session.add(name)
-                db.session.commit()
+                updated_names.append(name)
 
         def creators(json, key="creators"):
-            _creators = deepcopy(json.get(key, []))
-            _creators = list(filter(lambda x: x is not None, _creators))
+            # the translated record is owned by this transform, the creators
+            # are updated in place
+            _creators = [c for c in json.get(key, []) if c is not None]
             for creator in _creators:
                 creator_affiliations(creator)
                 lookup_person_id(creator)
@@ -392,13 +399,23 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                     )
             return identifiers
 
+        person_names = self._lookup_person_names(
+            json_entry.get("creators", []) + json_entry.get("contributors", [])
+        )
+        updated_names = []
+        _creators = creators(json_entry)
+        _contributors = creators(json_entry, key="contributors")
+        if updated_names:
+            # store the names vocabulary updates of all the authors at once
+            db.session.commit()
+
         metadata = {
-            "creators": creators(json_entry),
+            "creators": _creators,
             "title": json_entry.get("title"),
             "resource_type": _resource_type(json_entry),
             "description": json_entry.get("description"),
             "publication_date": _publication_date(json_entry, record_dump),
-            "contributors": creators(json_entry, key="contributors"),
+            "contributors": _contributors,
             "subjects": json_entry.get("subjects"),
             "publisher": json_entry.get("publisher"),
             "additional_descriptions": json_entry.get("additional_descriptions"),
@@ -412,7 +429,7 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
             "copyright": json_entry.get("copyright"),
         }
 
-        keys = deepcopy(list(json_entry.keys()))
+        keys = list(json_entry.keys())
 
         helper_keys = [
             "recid",
@@ -429,7 +446,7 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
             if item in keys:
                 keys.remove(item)
 
-        forgotten_keys = [key for key in keys if key not in list(metadata.keys())]
+        forgotten_keys = [key for key in keys if key not in metadata]
         if forgotten_keys:
             raise ManualImportRequired("Unassigned metadata key", value=forgotten_keys)
         # filter empty keys
@@ -444,12 +461,10 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
             for experiment in experiments:
                 if experiment.lower().strip() == "not applicable":
                     continue
-                result = search_vocabulary(experiment, "experiments")
+                vocabulary_id = self.vocabularies.resolve(experiment, "experiments")
 
-                if result["hits"]["total"]:
-                    custom_fields_dict["cern:experiments"].append(
-                        {"id": result["hits"]["hits"][0]["id"]}
-                    )
+                if vocabulary_id:
+                    custom_fields_dict["cern:experiments"].append({"id": vocabulary_id})
                 else:
                     subj = json_output["metadata"].get("subjects", [])
                     subj.append({"subject": experiment})
@@ -465,10 +480,10 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
         def field_programmes(record_json):
             programme = record_json.get("custom_fields", {}).get("cern:programmes")
             if programme:
-                result = search_vocabulary(programme, "programmes")
+                vocabulary_id = self.vocabularies.resolve(programme, "programmes")
 
-                if result["hits"]["total"]:
-                    return {"id": result["hits"]["hits"][0]["id"]}
+                if vocabulary_id:
+                    return {"id": vocabulary_id}
                 else:
                     raise UnexpectedValue(
                         value=programme,
@@ -488,11 +503,9 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
                 "cern:departments", []
             )
             for department in departments:
-                result = search_vocabulary(department, "departments")
-                if result["hits"]["total"]:
-                    custom_fields_dict["cern:departments"].append(
-                        {"id": result["hits"]["hits"][0]["id"]}
-                    )
+                vocabulary_id = self.vocabularies.resolve(department, "departments")
+                if vocabulary_id:
+                    custom_fields_dict["cern:departments"].append({"id": vocabulary_id})
                 else:
                     subj = json_output["metadata"].get("subjects", [])
                     subj.append({"subject": department})
@@ -512,11 +525,11 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
             for accelerator in accelerators:
                 if accelerator.lower().strip() == "not applicable":
                     continue
-                result = search_vocabulary(accelerator, "accelerators")
-                if result["hits"]["total"]:
+                vocabulary_id = self.vocabularies.resolve(accelerator, "accelerators")
+                if vocabulary_id:
 
                     custom_fields_dict["cern:accelerators"].append(
-                        {"id": result["hits"]["hits"][0]["id"]}
+                        {"id": vocabulary_id}
                     )
 
                 else:
@@ -533,11 +546,9 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
             for beam in beams:
                 if beam.lower().strip() == "not applicable":
                     continue
-                result = search_vocabulary(beam, "beams")
-                if result["hits"]["total"]:
-                    custom_fields_dict["cern:beams"].append(
-                        {"id": result["hits"]["hits"][0]["id"]}
-                    )
+                vocabulary_id = self.vocabularies.resolve(beam, "beams")
+                if vocabulary_id:
+                    custom_fields_dict["cern:beams"].append({"id": vocabulary_id})
 
                 else:
                     raise UnexpectedValue(
@@ -629,9 +640,7 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
         self._verify_creation_date(entry, json_data)
         migration_logger.add_record(json_data)
 
-        clc_sync = deepcopy(json_data.get("_clc_sync", False))
-        if "_clc_sync" in json_data:
-            del json_data["_clc_sync"]
+        clc_sync = json_data.pop("_clc_sync", False)
 
         record_json_output = {
             "created": self._created(json_data),
@@ -672,9 +681,11 @@ class CDSToRDMRecordEntry(RDMRecordEntry):
         }
 
 
-class CDSToRDMRecordTransform(RDMRecordTransform):
+class CDSToRDMRecordTransform(MultiProcessTransformMixin, RDMRecordTransform):
     """CDSToRDMRecordTransform."""
 
+    json_logger_cls = RDMJsonLogger
+
     def __init__(
         self,
         workers=None,
@@ -683,13 +694,19 @@ class CDSToRDMRecordTransform(RDMRecordTransform):
         missing_users=None,
         community_id=None,
         dry_run=False,
+        warm_affiliations_cache=False,
+        preload_vocabularies=None,
     ):
         """Constructor."""
         self.files_dump_dir = Path(files_dump_dir).absolute().as_posix()
         self.missing_users_dir = Path(missing_users).absolute().as_posix()
         self.community_id = community_id
         self.dry_run = dry_run
-        self.db_state = {"affiliations": CDSMigrationAffiliationMapping}
+        self.warm_affiliations_cache = warm_affiliations_cache
+        self.db_state = {
+            "affiliations": AffiliationMappingCache(CDSMigrationAffiliationMapping),
+            "vocabularies": VocabularyResolver(preload_types=preload_vocabularies),
+        }
         super().__init__(workers, throw)
 
     def _community_id(self, entry, record):
@@ -723,35 +740,37 @@ class CDSToRDMRecordTransform(RDMRecordTransform):
 
     def _transform(self, entry):
         """Transform a single entry."""
-        # creates the output structure for load step
-        migration_logger = RDMJsonLogger()
-        try:
-            record = self._record(entry)
-            original_dump = record.pop("_original_dump", {})
-            clc_sync = record.pop("_clc_sync", {})
-
-            if record:
-                return {
-                    "record": record,
-                    "versions": self._versions(entry, record),
-                    "parent": self._parent(entry, record),
-                    "_original_dump": original_dump,
-                    "_clc_sync": clc_sync,
-                }
-        except (
-            LossyConversion,
-            RestrictedFileDetected,
-            UnexpectedValue,
-            ManualImportRequired,
-            MissingRequiredField,
-        ) as e:
-            migration_logger.add_log(e, record=entry)
+        with profiler.record(entry.get("recid"), "transform"):
+            # creates the output structure for load step
+            migration_logger = RDMJsonLogger()
+            try:
+                record = self._record(entry)
+                original_dump = record.pop("_original_dump", {})
+                clc_sync = record.pop("_clc_sync", {})
+
+                if record:
+                    return {
+                        "record": record,
+                        "versions": self._versions(entry, record),
+                        "parent": self._parent(entry, record),
+                        "_original_dump": original_dump,
+                        "_clc_sync": clc_sync,
+                    }
+            except (
+                LossyConversion,
+                RestrictedFileDetected,
+                UnexpectedValue,
+                ManualImportRequired,
+                MissingRequiredField,
+            ) as e:
+                migration_logger.add_log(e, record=entry)
 
     def _record(self, entry):
         # could be in draft as well, depends on how we decide to publish
         return CDSToRDMRecordEntry(
             missing_users_dir=self.missing_users_dir,
             affiliations_mapping=self.db_state["affiliations"],
+            vocabularies=self.db_state["vocabularies"],
             dry_run=self.dry_run,
         ).transform(entry)
 
@@ -843,6 +862,7 @@ class CDSToRDMRecordTransform(RDMRecordTransform):
                         "metadata": {},
                         "mimetype": file["mime"],
                         "checksum": file["checksum"],
+                        "size": file["size"],
                         "version": file["version"],
                         "access": file["status"],
                         "type": file["type"],
@@ -905,8 +925,34 @@ class CDSToRDMRecordTransform(RDMRecordTransform):
 
     def run(self, entries):
         """Run transformation step."""
+        affiliations_cache = self.db_state["affiliations"]
+        vocabularies = self.db_state["vocabularies"]
+        if self.warm_affiliations_cache:
+            affiliations_cache.warm()
+        else:
+            affiliations_cache.invalidate()
+        vocabularies.invalidate()
+        vocabularies.preload()
+        owners.invalidate()
+        if self._workers is not None:
+            # loaded once, before the worker processes are forked
+            owners.load()
+        migration_logger = RDMJsonLogger()
+        migration_logger.add_stats_source("affiliations cache", affiliations_cache)
+        migration_logger.add_stats_source("vocabularies cache", vocabularies)
+        migration_logger.add_stats_source("owners index", owners)
+        migration_logger.add_stats_source("model matching", migrator_marc21)
         return super().run(entries)
 
+    def _stats_sources(self):
+        """Return the stats sources whose counters are updated by the workers."""
+        return [
+            self.db_state["affiliations"],
+            self.db_state["vocabularies"],
+            owners,
+            migrator_marc21,
+        ]
+
     #
     #
     # "files": [
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration asynchronous stats load module."""
+
+import asyncio
+import json
+
+from opensearchpy import AsyncOpenSearch
+from opensearchpy.helpers import async_streaming_bulk
+
+from cds_migrator_kit.rdm.stats.event_generator import prepare_new_doc
+from cds_migrator_kit.rdm.stats.load import CDSRecordStatsLoad
+from cds_migrator_kit.rdm.stats.log import StatsLogger
+from cds_migrator_kit.rdm.stats.search import async_os_request, generate_query
+
+logger = StatsLogger.get_logger()
+
+_DONE = object()
+
+
+class StatsBulkSink:
+    """Bulk indexing of the new events, shared by all the recids."""
+
+    def __init__(
+        self,
+        client,
+        chunk_size=500,
+        max_chunk_bytes=50 * 1024 * 1024,
+        max_pending=10000,
+    ):
+        """Constructor.
+
+        :param client: async client of the destination cluster.
+        :param max_pending: events queued before the producers wait.
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.failed = 0
+        self._error = None
+        self._task = None
+
+    def start(self):
+        """Start indexing the queued events."""
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, action):
+        """Queue an event to index."""
+        if self._error:
+            raise self._error
+        await self.queue.put(action)
+
+    async def close(self):
+        """Index the queued events and stop."""
+        await self.queue.put(_DONE)
+        await self._task
+        if self._error:
+            raise self._error
+
+    async def _actions(self):
+        while True:
+            action = await self.queue.get()
+            if action is _DONE:
+                return
+            yield action
+
+    async def _run(self):
+        try:
+            async for ok, item in async_streaming_bulk(
+                self.client,
+                self._actions(),
+                chunk_size=self.chunk_size,
+                max_chunk_bytes=self.max_chunk_bytes,
+                raise_on_error=False,
+                max_retries=3,
+                yield_ok=False,
+            ):
+                error = item["create"]
+                # 409 Conflict: the event was migrated by a previous run
+                if error.get("status") == 409:
+                    continue
+                self.failed += 1
+                logger.error(f"Failed to index: {json.dumps(error, default=str)}")
+        except Exception as ex:
+            logger.exception("Bulk indexing of the events failed.")
+            self._error = ex
+            # unblock the producers until close
+            while await self.queue.get() is not _DONE:
+                pass
+
+
+class CDSRecordStatsAsyncLoad(CDSRecordStatsLoad):
+    """Load the statistics of many recids concurrently.
+
+    The legacy events of ``CONCURRENCY`` batches of recids (see
+    ``SRC_SEARCH_BATCH_SIZE``) are searched at the same time and the new
+    events of all of them go through the same bulk indexing. The migrated
+    counts are validated once all the events are indexed.
+    """
+
+    def __init__(self, config, less_than_date, dry_run=False, log_dir=None):
+        """Constructor."""
+        super().__init__(config, less_than_date, dry_run=dry_run, log_dir=log_dir)
+        self.concurrency = config.get("CONCURRENCY", 8)
+
+    def _init_config(self, config):
+        # the async clients are bound to the event loop of the run
+        pass
+
+    def _client(self, hosts):
+        return AsyncOpenSearch(hosts=hosts)
+
+    def run(self, entries, cleanup=False):
+        """Load entries."""
+        asyncio.run(self._run(entries))
+        if cleanup:
+            self._cleanup()
+
+    async def _run(self, entries):
+        self.src_os_client = self._client(self.config["SRC_SEARCH_HOSTS"])
+        self.dest_os_client = self._client(self.config["DEST_SEARCH_HOSTS"])
+        self.sink = StatsBulkSink(self.dest_os_client)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        self._start_reconciliation()
+        try:
+            self.sink.start()
+            for event_type, records in self._batches(entries):
+                await semaphore.acquire()
+                task = asyncio.create_task(
+                    self._load_batch(event_type, records, semaphore)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+            await self.sink.close()
+            logger.info(f"{self.sink.failed} events failed to be indexed.")
+            await self._validate_pending()
+        finally:
+            self._stop_reconciliation()
+            await self.src_os_client.close()
+            await self.dest_os_client.close()
+
+    async def _load_batch(self, event_type, records, semaphore):
+        try:
+            await self._process_legacy_events(records, "cds*", event_type)
+            self._pending_validation.extend((event_type, record) for record in records)
+        except Exception as ex:
+            logger.error(ex)
+        finally:
+            semaphore.release()
+
+    async def _process_legacy_events(self, rec_contexts, index, event_type):
+        recid = self._query_recids(rec_contexts)
+        data = await async_os_request(
+            self.src_os_client.search,
+            index=index,
+            size=self.config["SRC_SEARCH_SIZE"],
+            scroll=self.config["SRC_SEARCH_SCROLL"],
+            body=generate_query(
+                event_type, recid, self.LEGACY_TO_RDM_EVENTS_MAP, self.less_than_date
+            ),
+        )
+        sid = data["_scroll_id"]
+        total = data["hits"]["total"]["value"]
+        logger.info("Total number of results for id: {0} <{1}>".format(total, recid))
+        try:
+            while data["hits"]["hits"]:
+                for rec_context, recid_data in self._route_hits(data, rec_contexts):
+                    for new_doc in prepare_new_doc(
+                        recid_data,
+                        rec_context,
+                        logger,
+                        event_type,
+                        self.LEGACY_TO_RDM_EVENTS_MAP,
+                        self.config["DEST_SEARCH_INDEX_PREFIX"],
+                    ):
+                        if self.dry_run:
+                            logger.info(json.dumps(new_doc))
+                        else:
+                            await self.sink.put(new_doc)
+                data = await async_os_request(
+                    self.src_os_client.scroll,
+                    scroll_id=sid,
+                    scroll=self.config["SRC_SEARCH_SCROLL"],
+                )
+                sid = data["_scroll_id"]
+        finally:
+            await self.src_os_client.clear_scroll(scroll_id=sid)
+        logger.info(f"Done {recid} `{event_type}`!")
+
+    async def _validate_pending(self):
+        """Validate the counts of the loaded records, with one refresh."""
+        by_event_type = self._pop_pending_validation()
+        for index in {self._dest_index(event_type) for event_type in by_event_type}:
+            await self.dest_os_client.indices.refresh(index=index)
+
+        size = self.config.get("VALIDATION_BATCH_SIZE", 1000)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def validate(event_type, records):
+            legacy, new = self._count_searches(event_type, records)
+            async with semaphore:
+                try:
+                    legacy_result, new_result = await asyncio.gather(
+                        async_os_request(
+                            self.src_os_client.search,
+                            index=legacy[0],
+                            body=legacy[1],
+                            size=0,
+                        ),
+                        async_os_request(
+                            self.dest_os_client.search,
+                            index=new[0],
+                            body=new[1],
+                            size=0,
+                        ),
+                    )
+                except Exception as ex:
+                    logger.error(ex)
+                    return
+            self._reconcile(event_type, records, legacy_result, new_result)
+
+        await asyncio.gather(
+            *(
+                validate(event_type, records[i : i + size])
+                for event_type, records in by_event_type.items()
+                for i in range(0, len(records), size)
+            )
+        )
@@ -6,6 +6,7 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM migration load module."""
+import csv
 import json
 import logging
 import os
@@ -17,6 +18,7 @@ from cds_migrator_kit.rdm.stats.log import StatsLogger
 from cds_migrator_kit.rdm.stats.search import (
     bulk_index_documents,
     generate_query,
+    os_aggregate,
     os_count,
     os_scroll,
     os_search,
@@ -56,16 +58,32 @@ class CDSRecordStatsLoad(Load):
         },
     }
 
+    RECONCILIATION_COLUMNS = [
+        "recid",
+        "parent_recid",
+        "event_type",
+        "legacy_count",
+        "rdm_count",
+    ]
+
     def __init__(
         self,
         config,
         less_than_date,
         dry_run=False,
+        log_dir=None,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param log_dir: directory of the reconciliation report of the counts.
+        """
         self.config = config
         self.less_than_date = less_than_date
         self.dry_run = dry_run
+        self.log_dir = log_dir
+        self._pending_validation = []
+        self._reconciliation_file = None
+        self._reconciliation_writer = None
         self._init_config(config)
 
     def _init_config(self, config):
@@ -95,7 +113,48 @@ class CDSRecordStatsLoad(Load):
         except Exception as ex:
             logger.error(str(ex))
 
+    def _batches(self, entries):
+        """Group the entries by event type, in batches of recids."""
+        size = max(1, self.config.get("SRC_SEARCH_BATCH_SIZE", 1))
+        batches = {}
+        for entry in entries:
+            if not entry:
+                continue
+            event_type, record = entry
+            batch = batches.setdefault(event_type, [])
+            batch.append(record)
+            if len(batch) >= size:
+                yield event_type, batches.pop(event_type)
+        for event_type, batch in batches.items():
+            yield event_type, batch
+
+    @staticmethod
+    def _query_recids(rec_contexts):
+        """Return the recid, or the list of recids, to query the events of."""
+        recids = [rec_context["legacy_recid"] for rec_context in rec_contexts]
+        return recids[0] if len(recids) == 1 else recids
+
+    @staticmethod
+    def _route_hits(data, rec_contexts):
+        """Split a page of legacy events by recid.
+
+        :returns: the context of each recid and its events, in the search format.
+        """
+        contexts = {str(c["legacy_recid"]): c for c in rec_contexts}
+        hits = {}
+        for hit in data["hits"]["hits"]:
+            hits.setdefault(str(hit["_source"]["id_bibrec"]), []).append(hit)
+        for recid, recid_hits in hits.items():
+            if recid not in contexts:
+                logger.error(f"Events of recid {recid} not requested.")
+                continue
+            yield contexts[recid], {"hits": {"hits": recid_hits}}
+
     def _process_legacy_events_for_recid(self, recid, rec_context, index, event_type):
+        self._process_legacy_events_for_recids([rec_context], index, event_type)
+
+    def _process_legacy_events_for_recids(self, rec_contexts, index, event_type):
+        recid = self._query_recids(rec_contexts)
         data = os_search(
             self.src_os_client,
             index,
@@ -112,7 +171,10 @@ class CDSRecordStatsLoad(Load):
         total = data["hits"]["total"]["value"]
         logger.info("Total number of results for id: {0} <{1}>".format(total, recid))
 
-        self._generate_new_events(data, rec_context, logger, doc_type=event_type)
+        for rec_context, recid_data in self._route_hits(data, rec_contexts):
+            self._generate_new_events(
+                recid_data, rec_context, logger, doc_type=event_type
+            )
 
         tot_chunks = total // self.config["SRC_SEARCH_SIZE"]
         if total % self.config["SRC_SEARCH_SIZE"] > 0:
@@ -134,41 +196,42 @@ class CDSRecordStatsLoad(Load):
             if total == 0:
                 continue
 
-            self._generate_new_events(data, rec_context, logger, doc_type=event_type)
+            for rec_context, recid_data in self._route_hits(data, rec_contexts):
+                self._generate_new_events(
+                    recid_data, rec_context, logger, doc_type=event_type
+                )
 
         self.src_os_client.clear_scroll(scroll_id=sid)
 
         logger.info("Done!")
 
-    def validate_stats_for_recid(self, recid, record, event_type):
-        """Validate that stats in legacy and new RDM."""
-        legacy_total = os_count(
-            self.src_os_client,
-            "cds*",
-            q=generate_query(
-                event_type, recid, self.LEGACY_TO_RDM_EVENTS_MAP, self.less_than_date
-            ),
+    def _dest_index(self, event_type):
+        """Return the RDM index pattern of the events of a type."""
+        return f"{self.config['DEST_SEARCH_INDEX_PREFIX']}-{self.LEGACY_TO_RDM_EVENTS_MAP[event_type]['type']}*"
+
+    def _validation_queries(self, recid, record, event_type):
+        """Return the legacy and the RDM index and count query of a recid."""
+        legacy_query = generate_query(
+            event_type, recid, self.LEGACY_TO_RDM_EVENTS_MAP, self.less_than_date
         )
+        _index = self._dest_index(event_type)
+        new_query = {
+            "query": {
+                "bool": {
+                    "must": [
+                        {"match": {"parent_recid": record["parent_recid"]}},
+                        {"match": {"is_lcds": True}},
+                    ]
+                }
+            }
+        }
+        return ("cds*", legacy_query), (_index, new_query)
+
+    def _report_validation(self, recid, event_type, legacy_total, new_total):
+        """Log the comparison of the legacy and RDM counts of a recid."""
         logger.info(
             f"Total amount of records of type `{event_type}` in legacy: {legacy_total['count']}"
         )
-        _index = f"{self.config['DEST_SEARCH_INDEX_PREFIX']}-{self.LEGACY_TO_RDM_EVENTS_MAP[event_type]['type']}*"
-        # refresh index
-        self.dest_os_client.indices.refresh(index=_index)
-        new_total = os_count(
-            self.dest_os_client,
-            _index,
-            q={
-                "query": {
-                    "bool": {
-                        "must": [
-                            {"match": {"parent_recid": record["parent_recid"]}},
-                            {"match": {"is_lcds": True}},
-                        ]
-                    }
-                }
-            },
-        )
         logger.info(
             f"Total amount of records of type `{event_type}` in RDM: {new_total['count']}"
         )
@@ -183,6 +246,17 @@ class CDSRecordStatsLoad(Load):
                 f"Not all events of type {event_type} were migrated for record: {recid}. Legacy count: {legacy_total['count']} - RDM count: {new_total['count']}"
             )
 
+    def validate_stats_for_recid(self, recid, record, event_type):
+        """Validate that stats in legacy and new RDM."""
+        (legacy_index, legacy_query), (_index, new_query) = self._validation_queries(
+            recid, record, event_type
+        )
+        legacy_total = os_count(self.src_os_client, legacy_index, q=legacy_query)
+        # refresh index
+        self.dest_os_client.indices.refresh(index=_index)
+        new_total = os_count(self.dest_os_client, _index, q=new_query)
+        self._report_validation(recid, event_type, legacy_total, new_total)
+
     def _load(self, entry):
         """Use the services to load the entries."""
         if entry:
@@ -194,6 +268,132 @@ class CDSRecordStatsLoad(Load):
             except Exception as ex:
                 logger.error(ex)
 
+    def _count_searches(self, event_type, records):
+        """Return the legacy and RDM searches counting the events of records.
+
+        The events are counted by `id_bibrec` and `parent_recid` aggregations.
+        """
+        recids = [record["legacy_recid"] for record in records]
+        legacy_query = generate_query(
+            event_type, recids, self.LEGACY_TO_RDM_EVENTS_MAP, self.less_than_date
+        )
+        legacy_query["aggs"] = {
+            "recids": {"terms": {"field": "id_bibrec", "size": len(recids)}}
+        }
+        parent_recids = sorted({record["parent_recid"] for record in records})
+        new_query = {
+            "query": {
+                "bool": {
+                    "must": [
+                        {"terms": {"parent_recid": parent_recids}},
+                        {"match": {"is_lcds": True}},
+                    ]
+                }
+            },
+            "aggs": {
+                "recids": {
+                    "terms": {"field": "parent_recid", "size": len(parent_recids)}
+                }
+            },
+        }
+        return ("cds*", legacy_query), (self._dest_index(event_type), new_query)
+
+    def _reconcile(self, event_type, records, legacy_result, new_result):
+        """Compare the aggregated counts and report the mismatches."""
+
+        def counts(result):
+            buckets = result["aggregations"]["recids"]["buckets"]
+            return {str(bucket["key"]): bucket["doc_count"] for bucket in buckets}
+
+        legacy_counts, new_counts = counts(legacy_result), counts(new_result)
+        for record in records:
+            recid = record["legacy_recid"]
+            legacy_total = {"count": legacy_counts.get(str(recid), 0)}
+            new_total = {"count": new_counts.get(str(record["parent_recid"]), 0)}
+            self._report_validation(recid, event_type, legacy_total, new_total)
+            if legacy_total != new_total and self._reconciliation_writer:
+                self._reconciliation_writer.writerow(
+                    [
+                        recid,
+                        record["parent_recid"],
+                        event_type,
+                        legacy_total["count"],
+                        new_total["count"],
+                    ]
+                )
+        if self._reconciliation_file:
+            self._reconciliation_file.flush()
+
+    def _start_reconciliation(self):
+        """Open the reconciliation report, with the mismatching counts."""
+        self._reconciliation_file = None
+        self._reconciliation_writer = None
+        if self.log_dir:
+            self._reconciliation_file = open(
+                os.path.join(self.log_dir, "stats_reconciliation.csv"), "w"
+            )
+            self._reconciliation_writer = csv.writer(self._reconciliation_file)
+            self._reconciliation_writer.writerow(self.RECONCILIATION_COLUMNS)
+
+    def _stop_reconciliation(self):
+        if self._reconciliation_file:
+            self._reconciliation_file.close()
+
+    def _pop_pending_validation(self):
+        """Return the loaded records to validate, by event type."""
+        pending, self._pending_validation = self._pending_validation, []
+        by_event_type = {}
+        for event_type, record in pending:
+            by_event_type.setdefault(event_type, []).append(record)
+        return by_event_type
+
+    def _validate_pending(self):
+        """Validate the counts of the loaded records, with one refresh."""
+        by_event_type = self._pop_pending_validation()
+        for index in {self._dest_index(event_type) for event_type in by_event_type}:
+            self.dest_os_client.indices.refresh(index=index)
+        for event_type, records in by_event_type.items():
+            try:
+                (legacy_index, legacy_query), (_index, new_query) = (
+                    self._count_searches(event_type, records)
+                )
+                self._reconcile(
+                    event_type,
+                    records,
+                    os_aggregate(self.src_os_client, legacy_index, legacy_query),
+                    os_aggregate(self.dest_os_client, _index, new_query),
+                )
+            except Exception as ex:
+                logger.error(ex)
+
+    def run(self, entries, cleanup=False):
+        """Load entries, querying the events of batches of recids at once.
+
+        The counts are validated every ``VALIDATION_BATCH_SIZE`` records and at
+        the end of the run.
+        """
+        validation_size = self.config.get("VALIDATION_BATCH_SIZE", 1000)
+        self._start_reconciliation()
+        try:
+            for event_type, records in self._batches(entries):
+                try:
+                    self._process_legacy_events_for_recids(
+                        records, "cds*", event_type
+                    )
+                    self._pending_validation.extend(
+                        (event_type, record) for record in records
+                    )
+                except Exception as ex:
+                    logger.error(ex)
+                if len(self._pending_validation) >= validation_size:
+                    self._validate_pending()
+            self._validate_pending()
+        finally:
+            self._stop_reconciliation()
+
+        if cleanup:
+            self._cleanup()
+
     def _cleanup(self, *args, **kwargs):
         """Cleanup the entries."""
         pass
@@ -36,7 +36,10 @@ class RecordStatsRunner:
             extract=stream_definition.extract_cls(filepath),
             transform=stream_definition.transform_cls(),
             load=stream_definition.load_cls(
-                dry_run=dry_run, config=config, less_than_date=less_than_date
+                dry_run=dry_run,
+                config=config,
+                less_than_date=less_than_date,
+                log_dir=self.log_dir,
             ),
         )
 
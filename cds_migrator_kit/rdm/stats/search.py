@@ -7,6 +7,7 @@
 
 """CDS-RDM migration stats search module."""
 
+import asyncio
 import json
 import time
 from copy import deepcopy
@@ -17,9 +18,15 @@ from opensearchpy.helpers import BulkIndexError, parallel_bulk
 
 
 def generate_query(doc_type, identifier, legacy_to_rdm_events_map, less_than_date):
-    """Generate legacy query based on event type."""
+    """Generate legacy query based on event type.
+
+    A list of identifiers is queried at once with a `terms` query.
+    """
     q = deepcopy(legacy_to_rdm_events_map[doc_type]["query"])
-    q["query"]["bool"]["must"][0]["match"]["id_bibrec"] = identifier
+    if isinstance(identifier, (list, tuple)):
+        q["query"]["bool"]["must"][0] = {"terms": {"id_bibrec": list(identifier)}}
+    else:
+        q["query"]["bool"]["must"][0]["match"]["id_bibrec"] = identifier
     q["query"]["bool"]["must"][1]["match"]["event_type"] = doc_type
 
     # Convert to datetime object
@@ -90,6 +97,38 @@ def os_count(src_os_client, index, q):
     raise ex
 
 
+def os_aggregate(src_os_client, index, q):
+    """Aggregation utility, returns the aggregations of the query only."""
+    ex = None
+    i = 0
+    while i < 10:
+        try:
+            return src_os_client.search(
+                index=index,
+                body=q,
+                size=0,
+            )
+        except OpenSearchException as _ex:
+            i += 1
+            ex = _ex
+            time.sleep(10)
+    raise ex
+
+
+async def async_os_request(method, **kwargs):
+    """Call a method of the async client, with the retries of the utilities above."""
+    ex = None
+    i = 0
+    while i < 10:
+        try:
+            return await method(**kwargs)
+        except OpenSearchException as _ex:
+            i += 1
+            ex = _ex
+            await asyncio.sleep(10)
+    raise ex
+
+
 def bulk_index_documents(
     client,
     documents,
@@ -6,9 +6,11 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM migration streams module."""
+
 from invenio_rdm_migrator.streams import StreamDefinition
 from invenio_rdm_migrator.transform import IdentityTransform
 
+from .async_load import CDSRecordStatsAsyncLoad
 from .extract import LegacyRecordStatsExtract
 from .load import CDSRecordStatsLoad
 
@@ -19,3 +21,11 @@ RecordStatsStreamDefinition = StreamDefinition(
     load_cls=CDSRecordStatsLoad,
 )
 """ETL stream for CDS to RDM records statistics."""
+
+RecordStatsAsyncStreamDefinition = StreamDefinition(
+    name="stats",
+    extract_cls=LegacyRecordStatsExtract,
+    transform_cls=IdentityTransform,
+    load_cls=CDSRecordStatsAsyncLoad,
+)
+"""ETL stream for CDS to RDM records statistics, loading recids concurrently."""
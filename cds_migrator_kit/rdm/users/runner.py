@@ -59,7 +59,7 @@ class SubmitterRunner:
             stream_definition.name,
             extract=stream_definition.extract_cls(dirpath),
             transform=stream_definition.transform_cls(
-                dojson_model=users_migrator_marc21
+                dojson_model=users_migrator_marc21, fields_only=True
             ),
             load=stream_definition.load_cls(
                 dry_run=dry_run,
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS Migrator Records indexed error log."""
+
+import csv
+import sqlite3
+from contextlib import closing
+
+# counters maintained on every insert, see `ErrorLogStore.totals`
+TOTALS = {
+    "total": "1",
+    "critical": "NEW.priority = 'critical'",
+    "warning": "NEW.priority = 'warning'",
+    "errored": "NEW.clean = 'False'",
+    "migrated": "NEW.clean = 'True'",
+}
+
+
+class ErrorLogStore:
+    """Copy of the error log (CSV report) in SQLite.
+
+    The rows are indexed by recid, priority, clean and stage and the totals
+    of the report are updated on every insert, so the reports view can page
+    through the log without reading it all. Several processes can write to
+    it at the same time (transform workers).
+    """
+
+    def __init__(self, filepath, columns):
+        """Constructor.
+
+        :param filepath: path of the SQLite database.
+        :param columns: columns of the error log.
+        """
+        self.filepath = filepath
+        self.columns = columns
+        self._connection = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self.filepath, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{column} TEXT" for column in self.columns)
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS logs (id INTEGER PRIMARY KEY, {columns})"
+        )
+        for column in ("recid", "priority", "clean", "stage"):
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS logs_{column} ON logs ({column}, id)"
+            )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY, count INTEGER)"
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO totals VALUES (?, 0)", [(name,) for name in TOTALS]
+        )
+        for name, condition in TOTALS.items():
+            connection.execute(
+                f"CREATE TRIGGER IF NOT EXISTS count_{name} AFTER INSERT ON logs "
+                f"WHEN {condition} BEGIN "
+                f"UPDATE totals SET count = count + 1 WHERE name = '{name}'; END"
+            )
+        connection.commit()
+        return connection
+
+    def open(self, reset=False):
+        """Open the store for writing.
+
+        :param reset: drop the rows of the previous runs.
+        """
+        self._connection = self._connect()
+        if reset:
+            self._connection.execute("DELETE FROM logs")
+            self._connection.execute("UPDATE totals SET count = 0")
+            self._connection.commit()
+
+    def close(self):
+        """Close the store."""
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def _values(row, columns):
+        # same text values as the CSV report
+        return [
+            "" if row.get(column) is None else str(row[column]) for column in columns
+        ]
+
+    def add(self, row):
+        """Add a row of the error log."""
+        placeholders = ", ".join("?" for _ in self.columns)
+        self._connection.execute(
+            f"INSERT INTO logs ({', '.join(self.columns)}) VALUES ({placeholders})",
+            self._values(row, self.columns),
+        )
+        self._connection.commit()
+
+    def import_csv(self, csv_filepath):
+        """Fill the store with an error log written without it."""
+        placeholders = ", ".join("?" for _ in self.columns)
+        with closing(self._connect()) as connection:
+            with open(csv_filepath, "r") as csv_file:
+                connection.executemany(
+                    f"INSERT INTO logs ({', '.join(self.columns)}) "
+                    f"VALUES ({placeholders})",
+                    (
+                        self._values(row, self.columns)
+                        for row in csv.DictReader(csv_file)
+                    ),
+                )
+            connection.commit()
+
+    def totals(self):
+        """Return the totals of the report (rows, migrated, errored...)."""
+        with closing(self._connect()) as connection:
+            return dict(connection.execute("SELECT name, count FROM totals"))
+
+    def page(self, after=None, before=None, errors_only=False, size=1000):
+        """Return a page of rows, after or before a row id.
+
+        :returns: the rows, the id to go to the previous page from (or None)
+                  and the id to go to the next page from (or None).
+        """
+        conditions, params = [], []
+        if errors_only:
+            conditions.append("clean = 'False'")
+        if before is not None:
+            conditions.append("id < ?")
+            params.append(before)
+        elif after is not None:
+            conditions.append("id > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "DESC" if before is not None else "ASC"
+
+        with closing(self._connect()) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                f"SELECT * FROM logs {where} ORDER BY id {order} LIMIT ?",
+                params + [size + 1],
+            ).fetchall()
+        more = len(rows) > size
+        rows = [dict(row) for row in rows[:size]]
+        if before is not None:
+            rows.reverse()
+            has_prev, has_next = more, True
+        else:
+            has_prev, has_next = after is not None, more
+        prev_page = rows[0]["id"] if rows and has_prev else None
+        next_page = rows[-1]["id"] if rows and has_next else None
+        return rows, prev_page, next_page
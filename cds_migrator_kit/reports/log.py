@@ -9,13 +9,19 @@
 """CDS Migrator Records loggers."""
 
 import csv
+import glob
 import json
 import logging
 import os
+import shutil
+import threading
 from copy import deepcopy
 
 from flask import current_app
 
+from .error_log import ErrorLogStore
+from .record_dump import RecordDumpIndex, dump_line
+
 
 class Singleton(type):
     """Temporary solution for this logger."""
@@ -34,6 +40,18 @@ class JsonLogger(metaclass=Singleton):
 
     logger = None
 
+    columns = [
+        "recid",
+        "stage",
+        "type",
+        "error",
+        "field",
+        "value",
+        "message",
+        "clean",
+        "priority",
+    ]
+
     @classmethod
     def initialize(cls, log_dir):
         """Constructor."""
@@ -89,6 +107,10 @@ class JsonLogger(metaclass=Singleton):
             self._logs_path, records_state_filename
         )
         self.collection = collection
+        self.record_dump_index = RecordDumpIndex(self.RECORD_FILEPATH)
+        self.error_log = ErrorLogStore(
+            f"{os.path.splitext(self.STAT_FILEPATH)[0]}.db", self.columns
+        )
 
         if not os.path.exists(self._logs_path):
             os.makedirs(self._logs_path)
@@ -96,9 +118,32 @@ class JsonLogger(metaclass=Singleton):
         self.error_file = None
         self.record_dump_file = None
         self._success_state_cache = {}
+        self._stats_sources = {}
+        # the steps of a pipelined stream log from different threads
+        self._lock = threading.RLock()
+
+    def start_log(self, append=False):
+        """Initialize logging file descriptors.
+
+        :param append: continue the log files of a previous (resumed) run.
+        """
+        if append:
+            has_header = os.path.exists(self.STAT_FILEPATH) and os.path.getsize(
+                self.STAT_FILEPATH
+            )
+            self.error_file = open(self.STAT_FILEPATH, "a")
+            self.record_dump_file = self._reopen_jsonl(self.RECORD_FILEPATH)
+            self.records_state_dump_file = self._reopen_json(
+                self.RECORD_STATE_FILEPATH, "[", "]"
+            )
+            self.log_writer = csv.DictWriter(self.error_file, fieldnames=self.columns)
+            if not has_header:
+                self.log_writer.writeheader()
+            self.error_log.open()
+            # keep what the workers of the interrupted run logged
+            self._merge_worker_logs()
+            return
 
-    def start_log(self):
-        """Initialize logging file descriptors."""
         # init log files
         self.error_file = open(self.STAT_FILEPATH, "w")
         self.record_dump_file = open(self.RECORD_FILEPATH, "w")
@@ -106,21 +151,104 @@ class JsonLogger(metaclass=Singleton):
         self.error_file.truncate(0)
         self.record_dump_file.truncate(0)
         self.records_state_dump_file.truncate(0)
-        columns = [
-            "recid",
-            "stage",
-            "type",
-            "error",
-            "field",
-            "value",
-            "message",
-            "clean",
-            "priority",
-        ]
-        self.log_writer = csv.DictWriter(self.error_file, fieldnames=columns)
+        self.log_writer = csv.DictWriter(self.error_file, fieldnames=self.columns)
         self.log_writer.writeheader()
-        self.record_dump_file.write("{\n")
+        self.record_dump_index.remove()
+        self.error_log.open(reset=True)
         self.records_state_dump_file.write("[\n")
+        # leftovers of an interrupted run
+        for filepath in (
+            self.STAT_FILEPATH,
+            self.RECORD_FILEPATH,
+            self.RECORD_STATE_FILEPATH,
+        ):
+            for shard_filepath in glob.glob(f"{filepath}.worker-*"):
+                os.remove(shard_filepath)
+
+    @staticmethod
+    def _reopen_json(filepath, opening, closing):
+        """Reopen a JSON dump of a previous run to append entries to it.
+
+        The dump is either finalised (closed by `closing`) or was interrupted
+        after an entry and its trailing comma.
+        """
+        with open(filepath, "ab+") as json_file:
+            size = json_file.seek(0, os.SEEK_END)
+            start = max(0, size - 64)
+            json_file.seek(start)
+            tail = json_file.read().rstrip()
+            if tail.endswith(closing.encode()):
+                tail = tail[:-1].rstrip()
+            json_file.truncate(start + len(tail))
+            if start == 0 and tail in (b"", opening.encode()):
+                json_file.truncate(0)
+                json_file.write(f"{opening}\n".encode())
+            elif tail.endswith(b","):
+                json_file.write(b"\n")
+            else:
+                json_file.write(b",\n")
+        json_file = open(filepath, "r+")
+        json_file.seek(0, os.SEEK_END)
+        return json_file
+
+    @staticmethod
+    def _reopen_jsonl(filepath):
+        """Reopen a JSON lines dump of a previous run to append entries to it.
+
+        A last line cut by the interruption of the run is dropped.
+        """
+        with open(filepath, "ab+") as jsonl_file:
+            end = jsonl_file.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 65536)
+                jsonl_file.seek(start)
+                newline = jsonl_file.read(end - start).rfind(b"\n")
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+            jsonl_file.truncate(end)
+        return open(filepath, "a")
+
+    def start_worker_log(self, worker_id):
+        """Initialize the log files of a transform worker process.
+
+        The files inherited from the parent process are left untouched, the
+        worker writes to its own shards which are merged on finalise.
+        """
+        self.error_file = open(f"{self.STAT_FILEPATH}.worker-{worker_id}", "w")
+        self.record_dump_file = open(f"{self.RECORD_FILEPATH}.worker-{worker_id}", "w")
+        self.records_state_dump_file = open(
+            f"{self.RECORD_STATE_FILEPATH}.worker-{worker_id}", "w"
+        )
+        self.log_writer = csv.DictWriter(self.error_file, fieldnames=self.columns)
+        # the connection of the parent process can not be used after forking
+        self.error_log = ErrorLogStore(self.error_log.filepath, self.columns)
+        self.error_log.open()
+        self._success_state_cache = {}
+        # the lock might have been held by another thread when forking
+        self._lock = threading.RLock()
+
+    def flush(self):
+        """Flush the log files."""
+        for log_file in (
+            self.error_file,
+            self.record_dump_file,
+            self.records_state_dump_file,
+        ):
+            log_file.flush()
+
+    def _merge_worker_logs(self):
+        """Append the log shards of the transform workers to the log files."""
+        for log_file, filepath in (
+            (self.error_file, self.STAT_FILEPATH),
+            (self.record_dump_file, self.RECORD_FILEPATH),
+            (self.records_state_dump_file, self.RECORD_STATE_FILEPATH),
+        ):
+            for shard_filepath in sorted(glob.glob(f"{filepath}.worker-*")):
+                with open(shard_filepath, "r") as shard:
+                    shutil.copyfileobj(shard, log_file)
+                os.remove(shard_filepath)
 
     def read_log(self):
         """Read error log file."""
@@ -129,18 +257,36 @@ class JsonLogger(metaclass=Singleton):
         for row in reader:
             yield row
 
+    def load_error_log(self):
+        """Return the indexed error log, built from the CSV one if missing."""
+        if not os.path.exists(self.error_log.filepath):
+            if not os.path.exists(self.STAT_FILEPATH):
+                raise FileNotFoundError(self.STAT_FILEPATH)
+            self.error_log.import_csv(self.STAT_FILEPATH)
+        return self.error_log
+
     def load_record_dumps(self):
-        """Load stats from file as json."""
-        self.record_dump_file = open(self.RECORD_FILEPATH, "r")
-        return json.load(self.record_dump_file)
+        """Iterate over the dumped records."""
+        with open(self.RECORD_FILEPATH, "r") as record_dump_file:
+            for line in record_dump_file:
+                yield json.loads(line)["record"]
+
+    def load_record_dump(self, recid):
+        """Load a dumped record, None if it is not in the dump."""
+        return self.record_dump_index.get(recid)
+
+    def add_stats_source(self, name, source):
+        """Register an object whose `stats` are logged on finalise."""
+        self._stats_sources[name] = source
 
     def finalise(self):
         """Finalise logging files."""
+        logger_migrator = logging.getLogger("migrator-rules")
+        for name, source in self._stats_sources.items():
+            logger_migrator.info(f"{name}: {source.stats}")
+        self._merge_worker_logs()
         self.error_file.close()
-        # remove last comma and newline in the json dump
-        self.record_dump_file.seek(self.record_dump_file.tell() - 2, os.SEEK_SET)
-        # close the dict
-        self.record_dump_file.write("}")
+        self.error_log.close()
         self.record_dump_file.close()
         self.records_state_dump_file.seek(
             self.records_state_dump_file.tell() - 2, os.SEEK_SET
@@ -150,12 +296,15 @@ class JsonLogger(metaclass=Singleton):
 
     def add_record(self, record, **kwargs):
         """Add record to list of collected records."""
-        recid = record["legacy_recid"]
-        self.record_dump_file.write(f'"{recid}": {json.dumps(record)},\n')
+        line = dump_line(record["legacy_recid"], record)
+        with self._lock:
+            self.record_dump_file.write(line)
 
     def add_record_state(self, record_state, **kwargs):
         """Add record state."""
-        self.records_state_dump_file.write(f"{json.dumps(record_state)},\n")
+        line = f"{json.dumps(record_state)},\n"
+        with self._lock:
+            self.records_state_dump_file.write(line)
 
     def add_log(self, exc, record=None, key=None, value=None):
         """Add exception log."""
@@ -180,7 +329,8 @@ class JsonLogger(metaclass=Singleton):
             "priority": getattr(exc, "priority", None),
             "clean": False,
         }
-        self.log_writer.writerow(error_format)
+        with self._lock:
+            self._write_log(error_format)
         logger_migrator.error(exc)
 
     def add_success_state(self, recid, state):
@@ -188,17 +338,31 @@ class JsonLogger(metaclass=Singleton):
 
         For example, we store affiliation warnings when we don't match.
         """
-        if recid in self._success_state_cache:
-            new_state = deepcopy(self._success_state_cache[recid])
-            new_state["message"] = f"{new_state['message']}\n{state['message']}"
-            new_state["value"] = f"{new_state['value']}\n{state['value']}"
-            state = new_state
-        self._success_state_cache[recid] = state
+        with self._lock:
+            if recid in self._success_state_cache:
+                new_state = deepcopy(self._success_state_cache[recid])
+                new_state["message"] = f"{new_state['message']}\n{state['message']}"
+                new_state["value"] = f"{new_state['value']}\n{state['value']}"
+                state = new_state
+            self._success_state_cache[recid] = state
+
+    def pop_success_states(self):
+        """Remove and return all the pending success states."""
+        with self._lock:
+            states = self._success_state_cache
+            self._success_state_cache = {}
+        return states
 
     def add_success(self, recid):
         """Log recid as success."""
-        _state = self._success_state_cache.pop(recid, {})
-        self.log_writer.writerow({"recid": recid, "clean": True, **_state})
+        with self._lock:
+            _state = self._success_state_cache.pop(recid, {})
+            self._write_log({"recid": recid, "clean": True, **_state})
+
+    def _write_log(self, row):
+        """Write a row to the error log and its indexed copy."""
+        self.log_writer.writerow(row)
+        self.error_log.add(row)
 
 
 class RDMJsonLogger(JsonLogger):
@@ -208,7 +372,7 @@ class RDMJsonLogger(JsonLogger):
         """Constructor."""
         super().__init__(
             stats_filename="rdm_migration_errors.csv",
-            records_filename="rdm_records_dump.json",
+            records_filename="rdm_records_dump.jsonl",
             records_state_filename="rdm_records_state.json",
             collection=collection,
         )
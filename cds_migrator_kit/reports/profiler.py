@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS Migrator Records profiler."""
+
+import cProfile
+import csv
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# record being processed by the current thread
+_current_record = ContextVar("profiled_record", default=None)
+
+SECONDS_BUCKETS = [0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60]
+QUERIES_BUCKETS = [0, 1, 5, 10, 50, 100, 500, 1000]
+
+
+class RecordTimings:
+    """Timings of a record in a migration step."""
+
+    def __init__(self, recid, step):
+        """Constructor."""
+        self.recid = recid
+        self.step = step
+        self.stages = {}
+        self.queries = 0
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count the queries run while processing a record."""
+    timings = _current_record.get()
+    if timings is not None:
+        timings.queries += 1
+
+
+def _summary(values, buckets):
+    """Return the statistics and the histogram of a list of values."""
+    values = sorted(values)
+    count = len(values)
+    overflow = f">{buckets[-1]}"
+    histogram = {f"<={bucket}": 0 for bucket in buckets}
+    histogram[overflow] = 0
+    for value in values:
+        bucket = next((f"<={b}" for b in buckets if value <= b), overflow)
+        histogram[bucket] += 1
+    return {
+        "count": count,
+        "total": sum(values),
+        "mean": sum(values) / count,
+        "p50": values[int(0.5 * (count - 1))],
+        "p90": values[int(0.9 * (count - 1))],
+        "p99": values[int(0.99 * (count - 1))],
+        "max": values[-1],
+        "histogram": histogram,
+    }
+
+
+class MigrationProfiler:
+    """Per record and per stage timings of a migration run.
+
+    Disabled by default, in which case the instrumentation costs a single
+    attribute check. Stage timings are inclusive of the nested stages.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self.enabled = False
+        self._lock = threading.Lock()
+        # timings of a worker process, sent back to the parent process
+        self._worker_records = None
+
+    def start(self, report_dir, slowest=10, capture=False):
+        """Start profiling.
+
+        :param report_dir: directory to write the reports to.
+        :param slowest: number of slowest records to report.
+        :param capture: keep a cProfile capture of the slowest records.
+        """
+        self.report_dir = report_dir
+        self.slowest = slowest
+        self.capture = capture
+        self._durations = {}
+        self._queries = {}
+        self._slowest = []
+        self._counter = itertools.count()
+        self._records_file = open(
+            os.path.join(report_dir, "migration_profile.csv"), "w"
+        )
+        self._records_writer = csv.writer(self._records_file)
+        self._records_writer.writerow(["recid", "step", "stage", "seconds", "queries"])
+        event.listen(Engine, "before_cursor_execute", _count_query)
+        self._worker_records = None
+        self.enabled = True
+
+    def start_worker(self):
+        """Collect the timings of a forked worker process for its parent.
+
+        The report file inherited from the parent is left untouched, as
+        flushing it would write the rows buffered by the parent again.
+        """
+        if not self.enabled:
+            return
+        self.capture = False
+        self._durations = {}
+        self._queries = {}
+        self._slowest = []
+        self._worker_records = []
+
+    def pop_worker_records(self):
+        """Return the timings collected by the worker since the last call."""
+        records = self._worker_records or []
+        if self._worker_records is not None:
+            self._worker_records = []
+        return records
+
+    def add_worker_records(self, records):
+        """Add the timings collected by a worker process."""
+        for timings, duration in records:
+            self._add(timings, duration, None)
+
+    def flush(self):
+        """Write the buffered timings, e.g. before forking worker processes."""
+        if self.enabled and self._worker_records is None:
+            with self._lock:
+                self._records_file.flush()
+
+    @contextmanager
+    def record(self, recid, step):
+        """Profile the processing of a record in a migration step."""
+        if not self.enabled:
+            yield
+            return
+        timings = RecordTimings(recid, step)
+        token = _current_record.set(timings)
+        profile = cProfile.Profile() if self.capture else None
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            duration = time.perf_counter() - start
+            _current_record.reset(token)
+            self._add(timings, duration, profile)
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the record being profiled."""
+        timings = _current_record.get() if self.enabled else None
+        if timings is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings.stages[name] = (
+                timings.stages.get(name, 0) + time.perf_counter() - start
+            )
+
+    def profiled(self, name):
+        """Decorator timing a function as a stage of the profiled record."""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _add(self, timings, duration, profile):
+        """Collect the timings of a processed record."""
+        if self._worker_records is not None:
+            self._worker_records.append((timings, duration))
+            return
+        step = timings.step
+        with self._lock:
+            self._durations.setdefault(step, []).append(duration)
+            self._queries.setdefault(step, []).append(timings.queries)
+            self._records_writer.writerow(
+                [timings.recid, step, "total", f"{duration:.6f}", timings.queries]
+            )
+            for stage, seconds in timings.stages.items():
+                self._durations.setdefault(f"{step}/{stage}", []).append(seconds)
+                self._records_writer.writerow(
+                    [timings.recid, step, stage, f"{seconds:.6f}", ""]
+                )
+            slow = (duration, next(self._counter), timings, profile)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, slow)
+            elif self._slowest and duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, slow)
+
+    def stop(self):
+        """Stop profiling and write the report."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        event.remove(Engine, "before_cursor_execute", _count_query)
+        self._records_file.close()
+
+        slowest = []
+        profiles_dir = os.path.join(self.report_dir, "profiles")
+        for duration, _, timings, profile in sorted(self._slowest, reverse=True):
+            record = {
+                "recid": timings.recid,
+                "step": timings.step,
+                "seconds": duration,
+                "queries": timings.queries,
+                "stages": timings.stages,
+            }
+            if profile:
+                os.makedirs(profiles_dir, exist_ok=True)
+                record["profile"] = os.path.join(
+                    profiles_dir, f"{timings.recid}_{timings.step}.prof"
+                )
+                profile.dump_stats(record["profile"])
+            slowest.append(record)
+
+        report = {
+            "stages": {
+                key: _summary(durations, SECONDS_BUCKETS)
+                for key, durations in self._durations.items()
+            },
+            "queries": {
+                key: _summary(queries, QUERIES_BUCKETS)
+                for key, queries in self._queries.items()
+            },
+            "slowest": slowest,
+        }
+        with open(os.path.join(self.report_dir, "migration_profile.json"), "w") as fp:
+            json.dump(report, fp, indent=2, default=str)
+
+
+profiler = MigrationProfiler()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS Migrator Records dump index."""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import closing
+
+# the record dump lines start with the recid, see `dump_line`
+RECID_PREFIX = re.compile(rb'^\{"recid": ("(?:[^"\\]|\\.)*")')
+
+
+def dump_line(recid, record):
+    """Serialize a record as a line of the JSON lines dump."""
+    return json.dumps({"recid": str(recid), "record": record}) + "\n"
+
+
+class RecordDumpIndex:
+    """Index of the records of a JSON lines dump by recid.
+
+    The index is a SQLite sidecar of the dump with the position and length of
+    every record line. It is updated incrementally before each lookup with the
+    lines appended since, so it also works while a migration is running.
+    """
+
+    def __init__(self, dump_filepath):
+        """Constructor.
+
+        :param dump_filepath: path of the JSON lines dump.
+        """
+        self.dump_filepath = dump_filepath
+        self.filepath = f"{dump_filepath}.index.db"
+
+    def remove(self):
+        """Remove the index, e.g. when the dump is truncated."""
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.filepath)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS records "
+            "(recid TEXT PRIMARY KEY, offset INTEGER, length INTEGER)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS indexed (id INTEGER PRIMARY KEY, size INTEGER)"
+        )
+        return connection
+
+    def _refresh(self, connection):
+        """Index the complete lines appended to the dump since last time."""
+        row = connection.execute("SELECT size FROM indexed WHERE id = 0").fetchone()
+        indexed_size = row[0] if row else 0
+        size = os.path.getsize(self.dump_filepath)
+        if size < indexed_size:
+            # the dump was started again
+            connection.execute("DELETE FROM records")
+            indexed_size = 0
+        if size == indexed_size:
+            return
+
+        offset = indexed_size
+        rows = []
+        with open(self.dump_filepath, "rb") as dump_file:
+            dump_file.seek(offset)
+            for line in dump_file:
+                if not line.endswith(b"\n"):
+                    # still being written
+                    break
+                match = RECID_PREFIX.match(line)
+                if match:
+                    rows.append((json.loads(match.group(1)), offset, len(line)))
+                offset += len(line)
+        connection.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?)", rows)
+        connection.execute("INSERT OR REPLACE INTO indexed VALUES (0, ?)", (offset,))
+        connection.commit()
+
+    def get(self, recid):
+        """Return the dumped record or None if it is not in the dump."""
+        if not os.path.exists(self.dump_filepath):
+            return None
+        with closing(self._connect()) as connection:
+            self._refresh(connection)
+            row = connection.execute(
+                "SELECT offset, length FROM records WHERE recid = ?", (str(recid),)
+            ).fetchone()
+        if row is None:
+            return None
+        offset, length = row
+        with open(self.dump_filepath, "rb") as dump_file:
+            dump_file.seek(offset)
+            return json.loads(dump_file.read(length))["record"]
@@ -17,6 +17,8 @@ from .log import JsonLogger, RDMJsonLogger
 
 cli_logger = logging.getLogger("migrator")
 
+PAGE_SIZE = 1000
+
 blueprint = Blueprint(
     "cds_migrator_kit_records",
     __name__,
@@ -37,53 +39,33 @@ def index():
 def results(collection=None):
     """Render a basic view."""
     try:
-        display_errors_only = request.args.get("errors", 0)
-        reload = request.args.get("reload", 0)
-        page = request.args.get("page", 1)
-        pagination = request.args.get("pagination", 0)
-        prev_page = False
-        next_page = False
+        display_errors_only = request.args.get("errors", 0, type=int)
+        reload = request.args.get("reload", 0, type=int)
         logger = RDMJsonLogger(collection=collection)
-        record_logs = logger.read_log()
+        error_log = logger.load_error_log()
         template = "cds_migrator_kit_records/records.html"
-        record_logs = list(record_logs)
-        critical = 0
-        warning = 0
-        errored = 0
-        migrated = 0
-        total = len(record_logs)
-        if pagination:
-            page = int(page)
-            paginated_record_logs = record_logs[page * 1000 : page * 1000 + 999]
-            prev_page = page - 1 if page - 1 > 0 else None
-            next_page = page + 1 if page * 1000 + 1 < total else None
-        else:
-            paginated_record_logs = record_logs
-        for log in record_logs:
-            if log["priority"] == "critical":
-                critical += 1
-            if log["priority"] == "warning":
-                warning += 1
-            if log["clean"] == "False":
-                errored += 1
-            if log["clean"] == "True":
-                migrated += 1
+        totals = error_log.totals()
+        # keyset pagination: the page starts after (or ends before) a row id
+        record_logs, prev_page, next_page = error_log.page(
+            after=request.args.get("after", type=int),
+            before=request.args.get("before", type=int),
+            errors_only=bool(display_errors_only),
+            size=PAGE_SIZE,
+        )
+        total = totals["total"]
         return render_template(
             template,
-            record_logs=record_logs,
             total=total if total != 0 else 1,
-            critical=critical,
-            warning=warning,
-            migrated=migrated,
-            errored=errored,
+            critical=totals["critical"],
+            warning=totals["warning"],
+            migrated=totals["migrated"],
+            errored=totals["errored"],
             collection=collection,
             display_errors_only=display_errors_only,
             live_reload=reload,
-            page=page,
-            pagination=pagination,
             prev_page=prev_page,
             next_page=next_page,
-            paginated_record_logs=paginated_record_logs,
+            paginated_record_logs=record_logs,
         )
     except FileNotFoundError as e:
         template = "cds_migrator_kit_records/rectype_missing.html"
@@ -96,7 +78,7 @@ def results(collection=None):
 def send_json(collection, recid):
     """Serves static json preview output files."""
     logger = RDMJsonLogger(collection=collection)
-    records = logger.load_record_dumps()
-    if recid not in records:
+    record = logger.load_record_dump(recid)
+    if record is None:
         abort(404)
-    return jsonify(records[recid])
+    return jsonify(record)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Checkpoints of the migration streams runs."""
+
+import sqlite3
+import threading
+from collections import deque
+
+
+class CheckpointStore:
+    """Progress of a stream run, stored in a SQLite database.
+
+    The extract step reports the position in the dump file of every record it
+    yields, the load step reports the status of every record it processed.
+    As records are loaded in the extracted order, the position of the last
+    loaded record is where a resumed run can start from.
+    """
+
+    def __init__(self, filepath):
+        """Constructor.
+
+        :param filepath: path of the SQLite database.
+        """
+        self._connection = sqlite3.connect(str(filepath), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS records "
+            "(recid TEXT PRIMARY KEY, status TEXT, dump_file TEXT, offset INTEGER)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS dump_files "
+            "(dump_file TEXT PRIMARY KEY, offset INTEGER)"
+        )
+        self._connection.commit()
+        # records extracted but not loaded yet
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget the progress of the previous runs."""
+        with self._lock:
+            self._pending.clear()
+            self._connection.execute("DELETE FROM records")
+            self._connection.execute("DELETE FROM dump_files")
+            self._connection.commit()
+
+    def resume_offset(self, dump_file):
+        """Return the offset right after the last processed record of a file."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT offset FROM dump_files WHERE dump_file = ?", (dump_file,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def status(self, recid):
+        """Return the status of a record in the previous runs."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status FROM records WHERE recid = ?", (str(recid),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def extracted(self, recid, dump_file, offset):
+        """Register the position of an extracted record."""
+        with self._lock:
+            self._pending.append((str(recid), dump_file, offset))
+
+    def _save(self, recid, status, dump_file, offset):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+            (recid, status, dump_file, offset),
+        )
+        self._connection.execute(
+            "INSERT OR REPLACE INTO dump_files VALUES (?, ?)", (dump_file, offset)
+        )
+
+    def loaded(self, recid, status):
+        """Register the status of a loaded record.
+
+        The records extracted before it which never reached the load step
+        (e.g. they failed to transform) are marked as dropped.
+        """
+        recid = str(recid)
+        with self._lock:
+            while self._pending:
+                pending_recid, dump_file, offset = self._pending.popleft()
+                if pending_recid == recid:
+                    self._save(recid, status, dump_file, offset)
+                    break
+                self._save(pending_recid, "dropped", dump_file, offset)
+            self._connection.commit()
+
+    def flush(self):
+        """Mark the records which never reached the load step as dropped."""
+        with self._lock:
+            while self._pending:
+                recid, dump_file, offset = self._pending.popleft()
+                self._save(recid, "dropped", dump_file, offset)
+            self._connection.commit()
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify
+# it under the terms of the MIT License; see LICENSE file for more details.
+
+"""Pipelined migration stream."""
+
+import threading
+from datetime import datetime
+from functools import partial
+from queue import Empty, Full, Queue
+
+from flask import current_app
+from invenio_rdm_migrator.logging import Logger
+from invenio_rdm_migrator.streams import Stream
+
+# marks the end of the entries in a queue
+_DONE = object()
+
+
+class StreamStopped(Exception):
+    """The stream was stopped because one of its steps failed."""
+
+
+class PipelinedStream(Stream):
+    """ETL stream running its steps concurrently.
+
+    Extract and transform run in their own threads, load in the calling one.
+    The steps are connected by bounded queues, so a slow step makes the
+    previous ones wait instead of piling up entries in memory. If a step
+    fails, the others are stopped and the error is raised.
+    """
+
+    def __init__(
+        self, name, extract, transform, load, queue_size=100, metrics_interval=60
+    ):
+        """Constructor.
+
+        :param queue_size: maximum number of entries waiting between two steps.
+        :param metrics_interval: seconds between two progress reports.
+        """
+        super().__init__(name, extract, transform, load)
+        self.queue_size = queue_size
+        self.metrics_interval = metrics_interval
+        self._stop = threading.Event()
+        self._errors = []
+        self._counts = {"extract": 0, "transform": 0, "load": 0}
+
+    def _put(self, queue, entry):
+        """Put an entry in the queue, waiting for space."""
+        while not self._stop.is_set():
+            try:
+                queue.put(entry, timeout=1)
+                return
+            except Full:
+                continue
+        raise StreamStopped()
+
+    def _consume(self, queue, step):
+        """Iterate over the entries of the queue until the previous step ends."""
+        while True:
+            try:
+                entry = queue.get(timeout=1)
+            except Empty:
+                if self._stop.is_set():
+                    raise StreamStopped()
+                continue
+            if entry is _DONE:
+                return
+            self._counts[step] += 1
+            yield entry
+
+    def _extract(self, output):
+        for entry in self.extract.run():
+            self._counts["extract"] += 1
+            self._put(output, entry)
+        self._put(output, _DONE)
+
+    def _transform(self, input, output):
+        for entry in self.transform.run(self._consume(input, "transform")):
+            self._put(output, entry)
+        self._put(output, _DONE)
+
+    def _run_step(self, app, step, func):
+        """Run a step in its own app context."""
+        try:
+            with app.app_context():
+                func()
+        except StreamStopped:
+            pass
+        except Exception as exc:
+            Logger.get_logger().exception(
+                f"Stream {self.name} {step} step failed.", exc_info=1
+            )
+            self._errors.append(exc)
+            self._stop.set()
+
+    def _monitor(self, queues):
+        """Report the progress of the steps periodically."""
+        logger = Logger.get_logger()
+        last_counts = dict(self._counts)
+        while not self._stop.wait(self.metrics_interval):
+            counts = dict(self._counts)
+            steps = ", ".join(
+                f"{step} {count} "
+                f"({(count - last_counts[step]) / self.metrics_interval:.1f}/s)"
+                for step, count in counts.items()
+            )
+            depths = ", ".join(
+                f"{name} {queue.qsize()}/{self.queue_size}"
+                for name, queue in queues.items()
+            )
+            logger.info(f"Stream {self.name}: {steps} - queues: {depths}")
+            last_counts = counts
+
+    def run(self, cleanup=False):
+        """Run ETL stream."""
+        logger = Logger.get_logger()
+
+        start_time = datetime.now()
+        logger.info(f"Stream {self.name} started {start_time.isoformat()}")
+
+        self._stop.clear()
+        self._errors = []
+        app = current_app._get_current_object()
+        extracted = Queue(maxsize=self.queue_size)
+        transformed = Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(
+                target=self._run_step,
+                args=(app, "extract", partial(self._extract, extracted)),
+                name=f"{self.name}-extract",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._run_step,
+                args=(
+                    app,
+                    "transform",
+                    partial(self._transform, extracted, transformed),
+                ),
+                name=f"{self.name}-transform",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._monitor,
+                args=({"extracted": extracted, "transformed": transformed},),
+                name=f"{self.name}-monitor",
+                daemon=True,
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            self.load.run(self._consume(transformed, "load"), cleanup=cleanup)
+        except StreamStopped:
+            pass
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+        end_time = datetime.now()
+        logger.info(f"Stream ended {end_time.isoformat()}")
+
+        logger.info(f"Execution time: {end_time - start_time}")
@@ -7,6 +7,7 @@
 
 """InvenioRDM migration streams runner."""
 
+import os
 from pathlib import Path
 
 import yaml
@@ -14,6 +15,9 @@ from invenio_rdm_migrator.logging import FailedTxLogger, Logger
 from invenio_rdm_migrator.streams import Stream
 
 from cds_migrator_kit.reports.log import RDMJsonLogger
+from cds_migrator_kit.reports.profiler import profiler
+from cds_migrator_kit.runner.checkpoint import CheckpointStore
+from cds_migrator_kit.runner.pipeline import PipelinedStream
 
 
 # local version of the invenio-rdm-migrator Runner class
@@ -27,16 +31,49 @@ class Runner:
         with open(filepath) as f:
             return yaml.safe_load(f)
 
-    def __init__(self, stream_definitions, config_filepath, dry_run, collection):
-        """Constructor."""
+    def __init__(
+        self,
+        stream_definitions,
+        config_filepath,
+        dry_run,
+        collection,
+        stream_parse=False,
+        checkpoint=False,
+        resume=False,
+        pipelined=False,
+        profile=False,
+        profile_slowest=0,
+    ):
+        """Constructor.
+
+        :param checkpoint: save the progress of the streams after every record.
+        :param resume: continue from the checkpoints of the previous run.
+        :param pipelined: run the extract, transform and load steps concurrently,
+                          not compatible with the transform ``workers``.
+        :param profile: write a per record and per stage timings report.
+        :param profile_slowest: number of slowest records to keep a cProfile
+                                capture of.
+        """
         config = self._read_config(config_filepath)
         self.collection = collection
         self.db_uri = config.get("db_uri")
+        self.resume = resume
+        self.profile = profile
+        self.profile_slowest = profile_slowest
         # start parsing streams
         self.streams = []
+        self.checkpoints = {}
+        stream_cls = PipelinedStream if pipelined else Stream
         for definition in stream_definitions:
             if definition.name in config:
                 stream_config = config.get(definition.name) or {}
+                transform_config = stream_config[collection].get("transform", {})
+                if pipelined and transform_config.get("workers") is not None:
+                    # the worker processes would be forked from the transform
+                    # thread, while the other threads hold locks
+                    raise ValueError(
+                        "The transform workers cannot be used with a pipelined run."
+                    )
                 self.data_dir = Path(stream_config[collection].get("data_dir"))
                 self.data_dir.mkdir(parents=True, exist_ok=True)
 
@@ -56,19 +93,31 @@ class Runner:
                 tmp_dir = self.tmp_dir / definition.name
                 extract = None
                 transform = None
+                load_config = stream_config[collection].get("load", {})
 
-                if definition.extract_cls:
-                    extract = definition.extract_cls(
-                        **stream_config[collection].get("extract", {})
+                extract_config = stream_config[collection].get("extract", {})
+                if stream_parse:
+                    extract_config = {**extract_config, "stream_parse": True}
+                if checkpoint or resume:
+                    checkpoint_store = CheckpointStore(
+                        self.log_dir / f"{definition.name}_checkpoint.db"
                     )
+                    if not resume:
+                        checkpoint_store.reset()
+                    self.checkpoints[definition.name] = checkpoint_store
+                    extract_config = {**extract_config, "checkpoint": checkpoint_store}
+                    load_config = {**load_config, "checkpoint": checkpoint_store}
+
+                if definition.extract_cls:
+                    extract = definition.extract_cls(**extract_config)
                 if definition.transform_cls:
                     transform = definition.transform_cls(
                         dry_run=dry_run,
-                        **stream_config[collection].get("transform", {}),
+                        **transform_config,
                     )
 
                 self.streams.append(
-                    Stream(
+                    stream_cls(
                         definition.name,
                         extract,
                         transform,
@@ -77,7 +126,7 @@ class Runner:
                             data_dir=data_dir,
                             tmp_dir=tmp_dir,
                             dry_run=dry_run,
-                            **stream_config[collection].get("load", {}),
+                            **load_config,
                         ),
                     )
                 )
@@ -85,7 +134,13 @@ class Runner:
     def run(self):
         """Run ETL streams."""
         migration_logger = RDMJsonLogger(collection=self.collection)
-        migration_logger.start_log()
+        migration_logger.start_log(append=self.resume)
+        if self.profile:
+            profiler.start(
+                os.path.dirname(migration_logger.STAT_FILEPATH),
+                slowest=max(self.profile_slowest, 10),
+                capture=bool(self.profile_slowest),
+            )
         for stream in self.streams:
             try:
                 stream.run(cleanup=True)
@@ -97,3 +152,6 @@ class Runner:
                 raise e
             finally:
                 migration_logger.finalise()
+                profiler.stop()
+                if stream.name in self.checkpoints:
+                    self.checkpoints[stream.name].close()
@@ -7,7 +7,7 @@
 
 """CDS-RDM base migration model module."""
 
-from cds_dojson.overdo import OverdoBase
+from cds_migrator_kit.transform.overdo import CdsOverdoBase
 
 # Matching to a correct model is happening here
-migrator_marc21 = OverdoBase(entry_point_models="cds_migrator_kit.migrator.models")
+migrator_marc21 = CdsOverdoBase(entry_point_models="cds_migrator_kit.migrator.models")
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Offline benchmark of the MARC21 to JSON translation rules.
+
+It runs the dojson layer only (model matching and rules), no database or
+application is needed. Usage::
+
+    python -m cds_migrator_kit.transform.benchmark --save-baseline base.json
+    python -m cds_migrator_kit.transform.benchmark --baseline base.json
+"""
+
+import json
+import time
+import tracemalloc
+from xml.sax.saxutils import escape
+
+import click
+from cds_dojson.marc21.utils import create_record
+
+from cds_migrator_kit.transform import migrator_marc21
+from cds_migrator_kit.transform.dumper import CDSRecordDump
+
+# collection: datafields identifying the collection and its specific fields
+COLLECTIONS = {
+    "thesis": [
+        ("037", " ", " ", [("a", "CERN-THESIS-2020-{recid}")]),
+        ("260", " ", " ", [("c", "2020")]),
+        ("502", " ", " ", [("a", "PhD"), ("b", "Hamburg U."), ("c", "2020")]),
+        ("701", " ", " ", [("a", "Supervisor, Some")]),
+        ("980", " ", " ", [("a", "THESIS")]),
+    ],
+    "summer_student_note": [
+        ("037", " ", " ", [("a", "CERN-STUDENTS-Note-2017-{recid}")]),
+        ("269", " ", " ", [("a", "Geneva"), ("b", "CERN"), ("c", "24 Jun 2017")]),
+        ("906", " ", " ", [("p", "Some Supervisor")]),
+        ("980", " ", " ", [("a", "NOTE")]),
+    ],
+}
+
+# size: (number of authors, number of 8564_ fields)
+SIZES = {
+    "small": (1, 1),
+    "medium": (100, 20),
+    "large": (3000, 200),
+}
+
+
+def _datafield(tag, ind1, ind2, subfields, **params):
+    subfields = "".join(
+        f'<subfield code="{code}">{escape(value.format(**params))}</subfield>'
+        for code, value in subfields
+    )
+    return f'<datafield tag="{tag}" ind1="{ind1}" ind2="{ind2}">{subfields}</datafield>'
+
+
+def synthetic_marcxml(collection, recid, authors=1, files=0):
+    """Generate the MARCXML of a record of the collection.
+
+    :param collection: one of ``COLLECTIONS``.
+    :param authors: number of authors (1 ``100__`` and the rest ``700__``).
+    :param files: number of ``8564_`` fields.
+    """
+    fields = [
+        f'<controlfield tag="001">{recid}</controlfield>',
+        '<controlfield tag="005">20171208143004.0</controlfield>',
+        _datafield("041", " ", " ", [("a", "eng")]),
+        _datafield("245", " ", " ", [("a", "Synthetic record {recid}")], recid=recid),
+        _datafield("520", " ", " ", [("a", "Abstract of the record. " * 20)]),
+        _datafield("859", " ", " ", [("f", "submitter@cern.ch")]),
+        _datafield("916", " ", " ", [("s", "n"), ("w", "201738")]),
+        _datafield("963", " ", " ", [("a", "PUBLIC")]),
+    ]
+    for tag, ind1, ind2, subfields in COLLECTIONS[collection]:
+        fields.append(_datafield(tag, ind1, ind2, subfields, recid=recid))
+    for index in range(authors):
+        fields.append(
+            _datafield(
+                "100" if index == 0 else "700",
+                " ",
+                " ",
+                [
+                    ("a", "Author{index}, Name"),
+                    ("0", "AUTHOR|(CDS){index}"),
+                    ("u", "CERN"),
+                ],
+                index=index,
+            )
+        )
+    for index in range(files):
+        fields.append(
+            _datafield(
+                "856",
+                "4",
+                " ",
+                [
+                    ("s", "123456"),
+                    ("u", "http://cds.cern.ch/record/{recid}/files/file{index}.pdf"),
+                ],
+                recid=recid,
+                index=index,
+            )
+        )
+    return "<record>{}</record>".format("".join(fields))
+
+
+def synthetic_dump(collection, recid, authors=1, files=0):
+    """Generate a legacy record dump, as extracted from the legacy system."""
+    return {
+        "recid": recid,
+        "files": [],
+        "record": [
+            {
+                "modification_datetime": "2017-12-08T14:30:04",
+                "marcxml": synthetic_marcxml(collection, recid, authors, files),
+            }
+        ],
+    }
+
+
+def _translate(dump):
+    """Translate a dump, return the exception raised or None."""
+    try:
+        CDSRecordDump(data=dump).prepare_revisions()
+    except Exception as exc:
+        return exc
+
+
+def benchmark(dumps, repeat=3):
+    """Measure the translation throughput and allocations of a list of dumps.
+
+    :param dumps: record dumps to translate.
+    :param repeat: timed runs, the fastest one is reported.
+    :returns: the measures, the number of records which failed and the first
+              error (recid and exception) to investigate them.
+    """
+    # warm up the models index and the rules
+    errors = []
+    for dump in dumps:
+        exc = _translate(dump)
+        if exc is not None:
+            errors.append((dump["recid"], exc))
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for dump in dumps:
+            _translate(dump)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # allocations are traced in a separate run, tracing slows it down
+    peaks = []
+    tracemalloc.start()
+    try:
+        for dump in dumps:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            _translate(dump)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "records": len(dumps),
+        "errors": len(errors),
+        "first_error": f"{errors[0][0]}: {errors[0][1]!r}" if errors else None,
+        "records_per_sec": len(dumps) / best if best else None,
+        "peak_kib_per_record": sum(peaks) / len(peaks) / 1024,
+    }
+
+
+def synthetic_scenarios(collections=None, sizes=None, count=20):
+    """Yield the name and the dumps of the synthetic scenarios."""
+    for collection in collections or COLLECTIONS:
+        for size in sizes or SIZES:
+            authors, files = SIZES[size]
+            # fewer records of the large size to keep the run short
+            records = count if authors < 1000 else max(1, count // 10)
+            dumps = [
+                synthetic_dump(collection, recid, authors, files)
+                for recid in range(1000000, 1000000 + records)
+            ]
+            yield f"{collection}/{size}", dumps
+
+
+def rules_lookup(dumps, number=20):
+    """Compare the rules index lookups to the memoized ones of CdsOverdo.do.
+
+    :returns: microseconds per MARC field, uncached and memoized.
+    """
+    keys, lookups = [], []
+    for dump in dumps:
+        marc_record = create_record(dump["record"][-1]["marcxml"])
+        model = migrator_marc21.match(marc_record)
+        if model.index is None:
+            model.build()
+        for key, _ in marc_record.iteritems(repeated=True, with_order=False):
+            keys.append(key)
+            lookups.append((model.index.query, model._rules()))
+
+    def run(memoized):
+        start = time.perf_counter()
+        for _ in range(number):
+            for key, (query, memo) in zip(keys, lookups):
+                memo.get(key) if memoized else query(key)
+        return (time.perf_counter() - start) / number / len(keys) * 1e6
+
+    # fill the memo tables
+    for key, (query, memo) in zip(keys, lookups):
+        memo.setdefault(key, query(key))
+    return run(memoized=False), run(memoized=True)
+
+
+def replay_scenarios(filepaths):
+    """Yield the name and the dumps of legacy dump files."""
+    for filepath in filepaths:
+        with open(filepath, "r") as fp:
+            yield filepath, json.load(fp)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Return the regressions of the results compared to the baseline.
+
+    :param tolerance: relative slowdown or memory increase accepted.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if result["errors"] > reference["errors"]:
+            regressions.append(
+                f"{name}: {result['errors']} errors, baseline {reference['errors']}"
+            )
+        if result["records_per_sec"] < reference["records_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['records_per_sec']:.1f} records/s, "
+                f"baseline {reference['records_per_sec']:.1f}"
+            )
+        if result["peak_kib_per_record"] > reference["peak_kib_per_record"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{name}: {result['peak_kib_per_record']:.1f} KiB/record, "
+                f"baseline {reference['peak_kib_per_record']:.1f}"
+            )
+    return regressions
+
+
+@click.command("benchmark")
+@click.option("--collection", multiple=True, type=click.Choice(list(COLLECTIONS)))
+@click.option("--size", multiple=True, type=click.Choice(list(SIZES)))
+@click.option("--count", type=int, default=20, help="Records per scenario.")
+@click.option("--repeat", type=int, default=3, help="Timed runs per scenario.")
+@click.option("--dump", multiple=True, help="Replay a legacy dump file.")
+@click.option("--baseline", help="Baseline to compare the results to.")
+@click.option("--save-baseline", help="Save the results as baseline.")
+@click.option("--tolerance", type=float, default=0.2)
+@click.option(
+    "--rules-lookup",
+    "lookup",
+    is_flag=True,
+    help="Compare the rules lookups with and without the memo tables.",
+)
+def main(
+    collection,
+    size,
+    count,
+    repeat,
+    dump,
+    baseline,
+    save_baseline,
+    tolerance,
+    lookup,
+):
+    """Benchmark the MARC21 to JSON translation rules."""
+    if dump:
+        scenarios = replay_scenarios(dump)
+    else:
+        scenarios = synthetic_scenarios(collection, size, count)
+
+    if lookup:
+        for name, dumps in scenarios:
+            uncached, memoized = rules_lookup(dumps)
+            click.secho(
+                f"{name:35} {uncached:8.3f} us/field uncached "
+                f"{memoized:8.3f} us/field memoized ({uncached / memoized:.0f}x)"
+            )
+        return
+
+    results = {}
+    for name, dumps in scenarios:
+        results[name] = result = benchmark(dumps, repeat=repeat)
+        click.secho(
+            f"{name:35} {result['records_per_sec']:10.1f} records/s "
+            f"{result['peak_kib_per_record']:10.1f} KiB/record "
+            f"{result['errors']:5} errors"
+        )
+        if result["first_error"]:
+            click.secho(f"{'':35} first error {result['first_error']}", fg="red")
+
+    if save_baseline:
+        with open(save_baseline, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+    if baseline:
+        with open(baseline, "r") as fp:
+            regressions = compare(results, json.load(fp), tolerance)
+        for regression in regressions:
+            click.secho(f"REGRESSION {regression}", fg="red", bold=True)
+        if regressions:
+            raise click.exceptions.Exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ from cds_migrator_kit.errors import (
     UnexpectedValue,
 )
 from cds_migrator_kit.reports.handlers import migration_exception_handler
+from cds_migrator_kit.reports.profiler import profiler
 from cds_migrator_kit.transform import migrator_marc21
 from cds_migrator_kit.transform.errors import LossyConversion
 
@@ -63,6 +64,7 @@ class CDSRecordDump:
 
         self.files = files
 
+    @profiler.profiled("prepare_revision")
     def _prepare_revision(self, data):
         timestamp = arrow.get(data["modification_datetime"]).datetime
 
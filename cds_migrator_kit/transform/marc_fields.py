@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM extraction of selected MARC fields, without dojson."""
+
+from io import BytesIO
+
+from lxml import etree
+
+from cds_migrator_kit.errors import UnexpectedValue
+
+
+def _indicator(value):
+    # same normalisation as cds_dojson create_record
+    if value in ("", "#"):
+        return "_"
+    return value.replace(" ", "_")
+
+
+def extract_fields(marcxml, keys):
+    """Extract selected fields of a MARCXML record.
+
+    The record is parsed incrementally and only the selected fields are kept,
+    for the streams that need a few fields of many records (e.g. submitters).
+
+    :param marcxml: MARCXML of the record.
+    :param keys: field keys with the indicators (``859__``) or tags (``001``,
+                 ``700``, matching all the indicators).
+    :returns: dict of the key of each field found (tag and indicators) to the
+              list of its occurrences, the text of the control fields or a dict
+              of the subfield codes to the list of their values.
+    """
+    keys = set(keys)
+    tags = {key[:3] for key in keys}
+    if isinstance(marcxml, str):
+        marcxml = marcxml.encode("utf-8")
+
+    fields = {}
+    for _, element in etree.iterparse(
+        BytesIO(marcxml),
+        events=("end",),
+        tag=("{*}controlfield", "{*}datafield"),
+        recover=True,
+    ):
+        tag = element.get("tag", "!")
+        if tag in tags:
+            if element.tag.endswith("controlfield"):
+                fields.setdefault(tag, []).append(element.text or "")
+            else:
+                key = "{0}{1}{2}".format(
+                    tag,
+                    _indicator(element.get("ind1", "!")),
+                    _indicator(element.get("ind2", "!")),
+                )
+                if key in keys or tag in keys:
+                    subfields = {}
+                    for subfield in element.iterchildren("{*}subfield"):
+                        subfields.setdefault(subfield.get("code", "!"), []).append(
+                            subfield.text or ""
+                        )
+                    fields.setdefault(key, []).append(subfields)
+        element.clear()
+    return fields
+
+
+def extract_submitter(marcxml, keys=("859__",)):
+    """Extract the email of the record submitter.
+
+    Same result as the ``submitter`` rules, which are applied to each field in
+    the record order: the last field wins, even without email. Unlike the
+    conversion of the whole record, the other fields are not checked, no
+    ``LossyConversion`` is raised for the fields without rule.
+
+    :param keys: keys of the submitter fields.
+    """
+    submitter = None
+    # the keys in the order of their first field, as iterated by the model
+    for key, occurrences in extract_fields(marcxml, keys).items():
+        for subfields in occurrences:
+            emails = subfields.get("f", [])
+            if len(emails) > 1:
+                raise UnexpectedValue(field=key, subfield="f", value=tuple(emails))
+            submitter = emails[0].lower() if emails else None
+    return submitter or None
@@ -6,12 +6,27 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM overdo model."""
+
+import logging
+from collections import Counter
 from copy import deepcopy
 
-from cds_dojson.overdo import Overdo
+import pypeg2
+from cds_dojson.exceptions import ModelMissingException, MultipleModelsException
+from cds_dojson.overdo import Overdo, OverdoBase
 from dojson._compat import iteritems
 from dojson.errors import IgnoreKey, MissingRule
 from dojson.utils import GroupableOrderedDict
+from importlib_metadata import entry_points
+from invenio_query_parser.ast import BinaryOp, KeywordOp, ListOp, UnaryOp, ValueQuery
+from invenio_query_parser.parser import Main as QueryParser
+from invenio_query_parser.walkers.match_unit import MatchUnit, dottable_getitem
+from invenio_query_parser.walkers.pypeg_to_ast import PypegConverter
+
+logger = logging.getLogger("migrator")
+
+# marks a key not looked up in the rules index yet
+_UNKNOWN = object()
 
 
 class CdsOverdo(Overdo):
@@ -19,6 +34,17 @@ class CdsOverdo(Overdo):
 
     rectype = None
     _default_fields = None
+    _rules_index = None
+
+    def _rules(self):
+        """Return the memo of the rule matching each key, None if missing.
+
+        It is tied to the index, the index is rebuilt when rules are added.
+        """
+        if self._rules_index is not self.index:
+            self._rules_index = self.index
+            self._rules_memo = {}
+        return self._rules_memo
 
     def do(
         self,
@@ -63,9 +89,18 @@ class CdsOverdo(Overdo):
             items = blob.iteritems(repeated=True, with_order=False)
         else:
             items = iteritems(blob)
+        rules = self._rules()
         for key, value in items:
+            result = rules.get(key, _UNKNOWN)
+            if result is _UNKNOWN:
+                result = rules[key] = self.index.query(key)
+            if not result and MissingRule in handlers:
+                # handle the keys without rule without raising
+                handler = handlers[MissingRule]
+                if handler is not None:
+                    handler(MissingRule(key), output, key, value)
+                continue
             try:
-                result = self.index.query(key)
                 if not result:
                     raise MissingRule(key)
 
@@ -85,3 +120,139 @@ class CdsOverdo(Overdo):
                 else:
                     raise exc
         return output
+
+
+def _query_keywords(node):
+    """Return the MARC keywords a query looks at, None for free text terms."""
+    if isinstance(node, KeywordOp):
+        return {node.left.value}
+    if isinstance(node, ValueQuery):
+        return {None}
+    if isinstance(node, BinaryOp):
+        return _query_keywords(node.left) | _query_keywords(node.right)
+    if isinstance(node, UnaryOp):
+        return _query_keywords(node.op)
+    if isinstance(node, ListOp):
+        return set().union(*(_query_keywords(child) for child in node.children))
+    return set()
+
+
+class CdsOverdoBase(OverdoBase):
+    """Pick the model of a record by matching the models queries.
+
+    The queries are compiled once. Most of them only look at the collection
+    tags (980, 690), their result is cached per combination of collection
+    tags, so a record is usually dispatched with a dict lookup. The other
+    queries are evaluated on every record.
+    """
+
+    collection_tags = ("980", "690")
+
+    def __init__(
+        self, bases=None, entry_point_group=None, entry_point_models=None, maxsize=1000
+    ):
+        """Constructor.
+
+        :param maxsize: maximum number of cached collection tags combinations.
+        """
+        super().__init__(bases, entry_point_group, entry_point_models)
+        self.maxsize = maxsize
+        self._models = None
+        self._signatures = {}
+        self._last = (None, None)
+        self.matched = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    def _compile(self):
+        """Load the models and compile their queries."""
+        cached, evaluated = [], []
+        keywords = set()
+        for entry_point in entry_points(group=self.entry_point_models):
+            model = entry_point.load()
+            query = pypeg2.parse(model.__query__, QueryParser, whitespace="").accept(
+                PypegConverter()
+            )
+            query_keywords = _query_keywords(query)
+            if query_keywords and all(
+                keyword and keyword[:3] in self.collection_tags
+                for keyword in query_keywords
+            ):
+                cached.append((entry_point.name, model, query))
+                keywords.update(query_keywords)
+            else:
+                evaluated.append((entry_point.name, model, query))
+        self._models = (cached, evaluated, keywords)
+
+    def _signature(self, blob):
+        """Return the values of the collection tags of a record."""
+        # dict.get does not mark the keys as accessed in the record
+        return tuple(
+            sorted(
+                (key, repr(dict.get(blob, key)))
+                for key in blob.keys()
+                if key[:3] in self.collection_tags
+            )
+        )
+
+    def match(self, blob):
+        """Return the model matching the record."""
+        last_blob, model = self._last
+        if blob is last_blob:
+            return model
+        if self._models is None:
+            self._compile()
+        cached, evaluated, keywords = self._models
+
+        signature = self._signature(blob)
+        matches = self._signatures.get(signature)
+        if matches is None:
+            self.misses += 1
+            matches = [
+                (name, model)
+                for name, model, query in cached
+                if query.accept(MatchUnit(blob))
+            ]
+            if len(self._signatures) >= self.maxsize:
+                self._signatures.clear()
+            self._signatures[signature] = matches
+        else:
+            self.hits += 1
+            # the queries mark the keys they read as accessed, which is
+            # taken into account when looking for untranslated fields
+            for keyword in keywords:
+                dottable_getitem(blob, keyword)
+        matches = matches + [
+            (name, model)
+            for name, model, query in evaluated
+            if query.accept(MatchUnit(blob))
+        ]
+
+        if len(matches) > 1:
+            raise MultipleModelsException(
+                f"Found more than one models {matches} for record {blob}"
+            )
+        if not matches:
+            logger.warning(f"Model *not* found for record {blob}")
+            raise ModelMissingException("Model *not* found")
+        name, model = matches[0]
+        self._last = (blob, model)
+        self.matched[name] += 1
+        return model
+
+    def do(self, blob, **kwargs):
+        """Translate the record with its model."""
+        return self.match(blob).do(blob, **kwargs)
+
+    def missing(self, blob, **kwargs):
+        """Return the record keys not translated by its model."""
+        return self.match(blob).missing(blob, **kwargs)
+
+    @property
+    def stats(self):
+        """Return the number of records matched per model."""
+        return {
+            "models": dict(self.matched),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM migration multi-process transform module."""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from invenio_db import db
+
+from cds_migrator_kit.reports.profiler import profiler
+
+# state of the worker process, set by the pool initializer
+_worker = {}
+
+# usage counters of the stats sources, summed over the worker processes
+_COUNTERS = ("hits", "misses", "matched")
+
+
+def _pop_counters(sources):
+    """Return the usage counters of the stats sources and reset them."""
+    counters = []
+    for source in sources:
+        values = {}
+        for name in _COUNTERS:
+            value = getattr(source, name, None)
+            if value is not None:
+                values[name] = value
+                setattr(source, name, value.__class__())
+        counters.append(values)
+    return counters
+
+
+def _add_counters(sources, counters):
+    """Add the usage counters of a worker to the stats sources."""
+    for source, values in zip(sources, counters):
+        for name, value in values.items():
+            setattr(source, name, getattr(source, name) + value)
+
+
+def _init_worker(app, transform, json_logger_cls):
+    """Initialize a transform worker process."""
+    # own app context, hence own SQLAlchemy session
+    app.app_context().push()
+    # the pooled connections were inherited from the parent process
+    db.engine.dispose(close=False)
+    json_logger = json_logger_cls()
+    json_logger.start_worker_log(os.getpid())
+    # the profiling report is written by the parent process only
+    profiler.start_worker()
+    # the counters inherited from the parent process are not the worker's
+    sources = transform._stats_sources()
+    _pop_counters(sources)
+    _worker.update(transform=transform, json_logger=json_logger, sources=sources)
+
+
+def _transform_entry(entry):
+    """Transform an entry in a worker process.
+
+    :returns: tuple of the transformed entry, the success states logged while
+              transforming it, the error message, if any, the profiled
+              timings and the usage counters of the stats sources.
+    """
+    transform = _worker["transform"]
+    json_logger = _worker["json_logger"]
+    result, error = None, None
+    try:
+        result = transform._transform(entry)
+    except Exception as exc:
+        transform.logger.exception(entry, exc_info=True)
+        error = f"{exc.__class__.__name__}: {exc}"
+    finally:
+        db.session.remove()
+    # the worker process exits without flushing the open files
+    json_logger.flush()
+    return (
+        result,
+        json_logger.pop_success_states(),
+        error,
+        profiler.pop_worker_records(),
+        _pop_counters(_worker["sources"]),
+    )
+
+
+class TransformWorkerError(Exception):
+    """Transformation of an entry failed in a worker process."""
+
+
+class MultiProcessTransformMixin:
+    """Transform entries in a pool of forked worker processes.
+
+    Entries are transformed in parallel, but yielded in the order they were
+    extracted, so the load step still sees a single ordered stream.
+    """
+
+    json_logger_cls = None
+    # number of entries queued per worker
+    prefetch = 10
+
+    def _stats_sources(self):
+        """Return the stats sources whose counters are updated by the workers.
+
+        Their ``hits``, ``misses`` and ``matched`` counters are summed in the
+        parent process, which reports them.
+        """
+        return []
+
+    def _collect(self, future, json_logger):
+        """Collect the result of a worker."""
+        result, success_states, error, timings, counters = future.result()
+        for recid, state in success_states.items():
+            json_logger.add_success_state(recid, state)
+        profiler.add_worker_records(timings)
+        _add_counters(self._stats_sources(), counters)
+        if error and self._throw:
+            raise TransformWorkerError(error)
+        return result
+
+    def _multiprocess_transform(self, entries):
+        """Transform entries in parallel."""
+        json_logger = self.json_logger_cls()
+        # do not leave buffered data in the files inherited by the workers
+        json_logger.flush()
+        profiler.flush()
+        executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(current_app._get_current_object(), self, self.json_logger_cls),
+        )
+        pending = deque()
+        try:
+            for entry in entries:
+                pending.append(executor.submit(_transform_entry, entry))
+                if len(pending) >= self._workers * self.prefetch:
+                    result = self._collect(pending.popleft(), json_logger)
+                    if result:
+                        yield result
+            while pending:
+                result = self._collect(pending.popleft(), json_logger)
+                if result:
+                    yield result
+        finally:
+            executor.shutdown(cancel_futures=True)
@@ -7,6 +7,7 @@
 
 """cds-migrator-kit user api."""
 
+import logging
 from abc import ABC, abstractmethod
 from copy import deepcopy
 
@@ -19,6 +20,8 @@ from sqlalchemy.exc import IntegrityError
 
 from cds_migrator_kit.transform.dumper import CDSRecordDump
 
+logger = logging.getLogger("users")
+
 
 class MigrationUserAPI(ABC):
     """CDS missing user load class."""
@@ -71,22 +74,33 @@ class MigrationUserAPI(ABC):
             client_id=self.client_id, user_id=user_id, extra_data=extra_data
         )
 
+    def user_profile_data(self, person_id, extra_data):
+        """Return the profile data of a new user."""
+        profile_data = {}
+        if person_id:
+            profile_data["person_id"] = person_id
+        if "department" in extra_data:
+            profile_data["department"] = extra_data["department"]
+        return profile_data
+
+    def duplicated_username(self, email, username):
+        """Return the username of a user whose username is already taken.
+
+        If None, the user is not created.
+        """
+        email_username = email.split("@")[0]
+        return f"duplicated_{username}_{email_username}"
+
     def create_user(self, email, name, person_id, username, extra_data=None):
         """Create an invenio user."""
         user = self.create_invenio_user(email, username)
         user_id = user.id
-        profile_data = {}
         if person_id:
             identity = self.create_invenio_user_identity(user_id, person_id)
             db.session.add(identity)
-            profile_data = {
-                "person_id": person_id,
-            }
         if name:
-            if "department" in extra_data:
-                profile_data.update({"department": extra_data["department"]})
             profile = deepcopy(user.user_profile)
-            profile.update(profile_data)
+            profile.update(self.user_profile_data(person_id, extra_data or {}))
             user.user_profile = profile
             db.session.add(user)
 
@@ -94,3 +108,107 @@ class MigrationUserAPI(ABC):
         db.session.add(remote_account)
 
         return user
+
+    def _snapshot(self, users):
+        """Return the existing rows the new users could conflict with."""
+        emails = [user["email"].lower() for user in users]
+        usernames = set()
+        for user in users:
+            usernames.add(user["username"].lower())
+            duplicated = self.duplicated_username(user["email"], user["username"])
+            if duplicated:
+                usernames.add(duplicated)
+        person_ids = [user["person_id"] for user in users if user["person_id"]]
+
+        existing_emails = dict(
+            db.session.query(User._email, User.id).filter(User._email.in_(emails))
+        )
+        existing_usernames = {
+            username
+            for (username,) in db.session.query(User._username).filter(
+                User._username.in_([username.lower() for username in usernames])
+            )
+        }
+        existing_identities = dict(
+            db.session.query(UserIdentity.id, UserIdentity.id_user).filter(
+                UserIdentity.id.in_(person_ids)
+            )
+        )
+        return existing_emails, existing_usernames, existing_identities
+
+    def create_users(self, users):
+        """Create many invenio users in one transaction.
+
+        The emails, usernames and person ids are checked against the existing
+        rows beforehand, the same way as ``create_user`` and the submitters
+        load do one by one: an existing email or person id gives the id of
+        its user and a taken username is replaced (see
+        ``duplicated_username``). The users are then inserted together, with
+        their identities and remote accounts, and committed once.
+
+        :param users: list of dicts with the arguments of ``create_user``.
+        :returns: dict of the emails to the ids of their users.
+        """
+        emails, usernames, identities = self._snapshot(users)
+        user_ids = {}
+        new_users = []
+        for data in users:
+            email = data["email"].lower()
+            person_id = data["person_id"]
+            if email in emails:
+                user_ids[data["email"]] = emails[email]
+                continue
+            if person_id and person_id in identities:
+                # synced from the authentication service before
+                user_ids[data["email"]] = identities[person_id]
+                continue
+            username = data["username"]
+            if username.lower() in usernames:
+                duplicated = self.duplicated_username(data["email"], username)
+                if not duplicated or duplicated.lower() in usernames:
+                    logger.error(
+                        f"User not created, username already taken: "
+                        f"{data['email']}, username: {username}"
+                    )
+                    continue
+                username = duplicated
+            user = User(email=data["email"], username=username, active=False)
+            if data["name"]:
+                profile = deepcopy(user.user_profile)
+                profile.update(
+                    self.user_profile_data(person_id, data.get("extra_data") or {})
+                )
+                user.user_profile = profile
+            db.session.add(user)
+            new_users.append((data, user))
+            emails[email] = user
+            usernames.add(username.lower())
+            if person_id:
+                identities[person_id] = user
+
+        try:
+            db.session.flush()
+            for data, user in new_users:
+                if data["person_id"]:
+                    db.session.add(
+                        self.create_invenio_user_identity(user.id, data["person_id"])
+                    )
+                db.session.add(
+                    RemoteAccount(
+                        user_id=user.id,
+                        client_id=self.client_id,
+                        extra_data=data.get("extra_data") or {},
+                    )
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for email, user_id in list(user_ids.items()):
+            # users created earlier in the same batch
+            if isinstance(user_id, User):
+                user_ids[email] = user_id.id
+        for data, user in new_users:
+            user_ids[data["email"]] = user.id
+        return user_ids
@@ -6,15 +6,16 @@
 # the terms of the MIT License; see LICENSE file for more details.
 
 """CDS-RDM transform step module."""
-import csv
 import json
 import logging
-import os.path
 import re
 
 from invenio_accounts.models import User
+from invenio_db import db
 from invenio_rdm_migrator.load.base import Load
-from sqlalchemy.exc import NoResultFound
+
+from cds_migrator_kit.users.owners import owners
+from cds_migrator_kit.users.people import PersonDirectory
 
 cli_logger = logging.getLogger("migrator")
 
@@ -29,18 +30,90 @@ class CDSSubmitterLoad(Load):
         dry_run=False,
         logger=logging.getLogger("users"),
         user_api_cls=None,
+        person_directory=None,
+        batch_size=1000,
     ):
-        """Constructor."""
+        """Constructor.
+
+        :param person_directory: lookup of the missing users, shared between
+                                 runs (built from ``missing_users_dir`` if None).
+        :param batch_size: number of submitters created in one transaction.
+        """
         self.dry_run = dry_run
         self.missing_users_dir = missing_users_dir
         self.missing_users_filename = missing_users_filename
         self.dry_run = dry_run
         self.logger = logger
         self.user_api_cls = user_api_cls
+        self.batch_size = batch_size
+        self.user_ids = {}
+        self.person_directory = person_directory
+        if person_directory is None and missing_users_dir:
+            self.person_directory = PersonDirectory(
+                missing_users_dir, people_filename=missing_users_filename
+            )
+
+    def run(self, entries, cleanup=False):
+        """Load entries, creating the missing submitters in batches.
+
+        The ids of the submitters are kept in ``user_ids`` by email.
+        """
+        batch = []
+        for entry in entries:
+            if self._validate(entry) and entry.get("submitter"):
+                batch.append(entry["submitter"])
+            if len(batch) >= self.batch_size:
+                self._load_batch(batch)
+                batch = []
+        if batch:
+            self._load_batch(batch)
+
+        if self.person_directory:
+            self.person_directory.report(self.logger)
+        if cleanup:
+            self._cleanup()
+
+    def _load_batch(self, emails):
+        """Fetch or create the owners of a batch of submitters."""
+        emails = list(dict.fromkeys(emails))
+        existing = dict(
+            db.session.query(User._email, User.id).filter(User._email.in_(emails))
+        )
+        missing = []
+        for email in emails:
+            if email in existing:
+                self.user_ids[email] = existing[email]
+            else:
+                missing.append(email)
+        if not missing or self.dry_run:
+            return
+
+        user_api = self.user_api_cls()
+        try:
+            self.user_ids.update(
+                user_api.create_users([self._user_data(email) for email in missing])
+            )
+        except Exception as exc:
+            self.logger.error(
+                f"Batch of {len(missing)} users failed to be migrated, "
+                f"creating them one by one.\n {exc}"
+            )
+            for email in missing:
+                self.user_ids[email] = self._create_owner(email)
+
+        created = {}
+        for email in missing:
+            if email not in self.user_ids:
+                self.logger.error(f"User failed to be migrated: {email}")
+            elif self.user_ids[email] != -1:
+                created[email] = self.user_ids[email]
+        # the records migrated in the same process resolve the new owners
+        owners.add(created)
 
     def _load(self, entry):
-        """Load users."""
-        self._owner(entry)
+        """Load the submitter of an entry."""
+        if entry.get("submitter"):
+            self._load_batch([entry["submitter"]])
 
     def _validate(self, entry):
         """Validate data before loading."""
@@ -48,54 +121,15 @@ class CDSSubmitterLoad(Load):
             return False
         return True
 
-    def _owner(self, json_entry):
-        """Fetch or create owner."""
-        email = json_entry.get("submitter")
-        if not email:
-            return
-        try:
-            user = User.query.filter_by(email=email).one()
-            return user.id
-        except NoResultFound:
-            if not self.dry_run:
-                user_id = self._create_owner(email)
-                return user_id
-
-    def _create_owner(self, email_addr):
-        """Create owner from legacy data.
-
-        Every record needs an owner assigned in parent.access.owned_by
-        therefore we need to create dummy accounts
-        """
+    def _user_data(self, email_addr):
+        """Return the account data of a submitter, from the legacy data."""
         logger_users = self.logger
 
-        def get_person(email):
-            missing_users_dump = os.path.join(
-                self.missing_users_dir, self.missing_users_filename
-            )
-            with open(missing_users_dump) as csv_file:
-                for row in csv.reader(csv_file):
-                    if email == row[0].lower():
-                        return row
-
-        def get_person_old_db(email):
-            missing_users_dump = os.path.join(
-                self.missing_users_dir, "missing_users.json"
-            )
-            with open(missing_users_dump) as json_file:
-                missing = json.load(json_file)
-            person = next((item for item in missing if item["email"] == email), None)
-
-            return person
-
-        user_api = self.user_api_cls()
-        person = get_person(email_addr)
-        person_old_db = get_person_old_db(email_addr)
+        person, person_old_db = self.person_directory.lookup(email_addr)
 
         person_id = None
         displayname = None
         username = None
-        existing_identity = None
         extra_data = {"migration": {}}
 
         # first check if submitter email is in people collection.
@@ -140,8 +174,25 @@ class CDSSubmitterLoad(Load):
             logger_users.warning(f"User {email_addr} not found.")
         extra_data["migration"]["note"] = "MIGRATED INACTIVE ACCOUNT"
 
-        if person_id:
-            existing_identity = user_api.check_person_id_exists(person_id)
+        return {
+            "email": email_addr,
+            "name": displayname,
+            "username": username,
+            "person_id": person_id,
+            "extra_data": extra_data,
+        }
+
+    def _create_owner(self, email_addr):
+        """Create owner from legacy data.
+
+        Every record needs an owner assigned in parent.access.owned_by
+        therefore we need to create dummy accounts
+        """
+        user_api = self.user_api_cls()
+        data = self._user_data(email_addr)
+
+        if data["person_id"]:
+            existing_identity = user_api.check_person_id_exists(data["person_id"])
             # check if person ID was already registered in the DB by prior sync
             # and return that user as source of truth ( we assume auth service is most
             # up to date)
@@ -149,16 +200,12 @@ class CDSSubmitterLoad(Load):
                 return existing_identity.id_user
 
         try:
-            user = user_api.create_user(
-                email_addr,
-                name=displayname,
-                username=username,
-                person_id=person_id,
-                extra_data=extra_data,
-            )
+            user = user_api.create_user(**data)
+            db.session.commit()
         except Exception as exc:
-            logger_users.error(
-                f"User failed to be migrated: {email_addr}, {displayname}, {username}, {person_id}, {json.dumps(extra_data)} \n {exc}"
+            db.session.rollback()
+            self.logger.error(
+                f"User failed to be migrated: {email_addr}, {data['name']}, {data['username']}, {data['person_id']}, {json.dumps(data['extra_data'])} \n {exc}"
             )
             return -1
         return user.id
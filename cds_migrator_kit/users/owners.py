@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Index of the user ids of the record owners."""
+
+import logging
+
+from invenio_accounts.models import User
+from invenio_db import db
+
+logger = logging.getLogger("migrator")
+
+
+class OwnerIndex:
+    """In-memory map of the user emails to their ids.
+
+    It is loaded with a single query on the first lookup and shared by the
+    records transform of RDM and videos, so resolving the owner of a record
+    does not query the database. The emails without a user are logged once.
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._user_ids = None
+        self._missing = set()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """Load the emails and ids of all the users."""
+        query = db.session.query(User._email, User.id)
+        self._user_ids = dict(query.yield_per(10000))
+        self._missing = set()
+
+    def get(self, email):
+        """Return the id of the user with the email or None."""
+        if self._user_ids is None:
+            self.load()
+        user_id = self._user_ids.get(email)
+        if user_id is None:
+            self.misses += 1
+            if email not in self._missing:
+                self._missing.add(email)
+                logger.warning(f"No user found with email {email}.")
+        else:
+            self.hits += 1
+        return user_id
+
+    def add(self, user_ids):
+        """Register newly created users.
+
+        :param user_ids: dict of the emails to the ids of the users.
+        """
+        if self._user_ids is not None:
+            self._user_ids.update(user_ids)
+            self._missing.difference_update(user_ids)
+
+    def invalidate(self):
+        """Drop the index, it is loaded again on the next lookup."""
+        self._user_ids = None
+        self._missing = set()
+
+    @property
+    def stats(self):
+        """Return the index usage counters."""
+        return {
+            "size": len(self._user_ids or ()),
+            "missing": len(self._missing),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+owners = OwnerIndex()
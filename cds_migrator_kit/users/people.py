@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""CDS-RDM directory of the people missing from the DB."""
+
+import csv
+import json
+import os.path
+import time
+
+
+class PersonDirectory:
+    """Lookup of the submitters in the people collection and the legacy DB.
+
+    Both dumps are read once, on the first lookup, into indexes by email.
+    """
+
+    def __init__(
+        self,
+        missing_users_dir,
+        people_filename="people.csv",
+        legacy_users_filename="missing_users.json",
+    ):
+        """Constructor.
+
+        :param missing_users_dir: directory of the dumps.
+        :param people_filename: CSV dump of the people collection.
+        :param legacy_users_filename: JSON dump of the legacy DB users.
+        """
+        self.people_filepath = os.path.join(missing_users_dir, people_filename)
+        self.legacy_users_filepath = os.path.join(
+            missing_users_dir, legacy_users_filename
+        )
+        self._people = None
+        self._legacy_users = None
+        self.load_time = 0.0
+        self.lookups = 0
+        self.lookup_time = 0.0
+
+    def _load(self):
+        start = time.perf_counter()
+        people = {}
+        with open(self.people_filepath) as csv_file:
+            for row in csv.reader(csv_file):
+                # the first row of an email wins
+                people.setdefault(row[0].lower(), row)
+        legacy_users = {}
+        with open(self.legacy_users_filepath) as json_file:
+            for item in json.load(json_file):
+                legacy_users.setdefault(item["email"], item)
+        self._people, self._legacy_users = people, legacy_users
+        self.load_time = time.perf_counter() - start
+
+    def lookup(self, email):
+        """Return the people collection row and the legacy DB user of an email.
+
+        :returns: the CSV row (or None) and the legacy user (or None).
+        """
+        if self._people is None:
+            self._load()
+        start = time.perf_counter()
+        person = self._people.get(email)
+        person_old_db = self._legacy_users.get(email)
+        self.lookups += 1
+        self.lookup_time += time.perf_counter() - start
+        return person, person_old_db
+
+    def report(self, logger):
+        """Log the lookup timings."""
+        logger.info(
+            f"Person directory: {len(self._people or ())} people and "
+            f"{len(self._legacy_users or ())} legacy users loaded in "
+            f"{self.load_time:.3f}s, {self.lookups} lookups in "
+            f"{self.lookup_time:.3f}s."
+        )
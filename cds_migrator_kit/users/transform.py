@@ -13,6 +13,7 @@ import requests
 from invenio_rdm_migrator.streams.records.transform import RDMRecordTransform
 
 from cds_migrator_kit.transform.dumper import CDSRecordDump
+from cds_migrator_kit.transform.marc_fields import extract_submitter
 
 cli_logger = logging.getLogger("migrator")
 
@@ -20,16 +21,41 @@ cli_logger = logging.getLogger("migrator")
 class SubmitterTransform(RDMRecordTransform):
     """CDSToRDMAffiliationTransform."""
 
-    def __init__(self, dry_run=False, dojson_model=None):
-        """Constructor."""
+    def __init__(
+        self,
+        dry_run=False,
+        dojson_model=None,
+        fields_only=False,
+        submitter_keys=("859__",),
+    ):
+        """Constructor.
+
+        :param fields_only: read the submitter fields from the MARCXML instead
+                            of converting the whole record with the model.
+        :param submitter_keys: keys of the submitter fields, for ``fields_only``.
+        """
         self.dry_run = dry_run
         self.dojson_model = dojson_model
+        self.fields_only = fields_only
+        self.submitter_keys = submitter_keys
         super().__init__()
 
+    def run(self, entries):
+        """Transform the entries, once per submitter."""
+        seen = set()
+        for entry in super().run(entries):
+            email = entry and entry.get("submitter")
+            if email and email not in seen:
+                seen.add(email)
+                yield entry
+
     def _transform(self, entry):
         """Transform a single entry."""
         # creates the output structure for load step
         try:
+            if self.fields_only:
+                marcxml = entry["record"][-1]["marcxml"]
+                return {"submitter": extract_submitter(marcxml, self.submitter_keys)}
             record_dump = CDSRecordDump(entry, dojson_model=self.dojson_model)
             record_dump.prepare_revisions()
 
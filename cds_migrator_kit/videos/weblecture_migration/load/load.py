@@ -16,7 +16,6 @@ from cds.modules.flows.files import init_object_version
 from cds.modules.legacy.minters import legacy_recid_minter
 from cds.modules.legacy.models import CDSMigrationLegacyRecord
 from invenio_db import db
-from invenio_pidstore.models import PersistentIdentifier
 from invenio_rdm_migrator.load.base import Load
 from invenio_records_files.api import Record
 
@@ -25,6 +24,7 @@ from cds_migrator_kit.errors import (
     MissingRequiredField,
     UnexpectedValue,
 )
+from cds_migrator_kit.legacy_recids import LegacyRecidIndex
 from cds_migrator_kit.reports.log import RDMJsonLogger
 
 from .helpers import (
@@ -52,6 +52,7 @@ class CDSVideosLoad(Load):
     ):
         """Constructor."""
         self.dry_run = dry_run
+        LegacyRecidIndex.load()
 
     def _prepare(self, entry):
         """Prepare the record."""
@@ -189,11 +190,7 @@ class CDSVideosLoad(Load):
 
     def _have_migrated_recid(self, recid):
         """Check if we have minted `lrecid` pid."""
-        pid = PersistentIdentifier.query.filter_by(
-            pid_type="lrecid",
-            pid_value=recid,
-        ).one_or_none()
-        return pid is not None
+        return LegacyRecidIndex.contains(recid)
 
     def _should_skip_recid(self, recid):
         """Check if recid should be skipped."""
@@ -217,6 +214,7 @@ class CDSVideosLoad(Load):
 
             try:
                 self.create_publish_single_video_record(entry)
+                LegacyRecidIndex.add(recid)
                 migration_logger.add_success(recid)
             except (
                 UnexpectedValue,
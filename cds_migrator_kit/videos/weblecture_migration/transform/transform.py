@@ -13,13 +13,10 @@ from pathlib import Path
 
 import arrow
 from flask import current_app
-from invenio_accounts.models import User
-from invenio_pidstore.models import PersistentIdentifier
 from invenio_rdm_migrator.streams.records.transform import (
     RDMRecordEntry,
     RDMRecordTransform,
 )
-from sqlalchemy.exc import NoResultFound
 
 from cds_migrator_kit.errors import (
     ManualImportRequired,
@@ -27,9 +24,11 @@ from cds_migrator_kit.errors import (
     RestrictedFileDetected,
     UnexpectedValue,
 )
+from cds_migrator_kit.legacy_recids import LegacyRecidIndex
 from cds_migrator_kit.reports.log import RDMJsonLogger
 from cds_migrator_kit.transform.dumper import CDSRecordDump
 from cds_migrator_kit.transform.errors import LossyConversion
+from cds_migrator_kit.users.owners import owners
 from cds_migrator_kit.videos.weblecture_migration.transform import (
     videos_migrator_marc21,
 )
@@ -106,10 +105,8 @@ class CDSToVideosRecordEntry(RDMRecordEntry):
         if not email:
             email = current_app.config["WEBLECTURES_MIGRATION_SYSTEM_USER"]
             error_message = f"{email} not found - did you created system user?"
-        try:
-            user = User.query.filter_by(email=email).one()
-            return {"id": user.id, "email": email}
-        except NoResultFound:
+        user_id = owners.get(email)
+        if user_id is None:
             raise UnexpectedValue(
                 message=error_message,
                 stage="transform",
@@ -117,14 +114,11 @@ class CDSToVideosRecordEntry(RDMRecordEntry):
                 value=email,
                 priority="critical",
             )
+        return {"id": user_id, "email": email}
 
     def _have_migrated_recid(self, recid):
         """Check if we have minted `lrecid` pid."""
-        pid = PersistentIdentifier.query.filter_by(
-            pid_type="lrecid",
-            pid_value=recid,
-        ).one_or_none()
-        return pid is not None
+        return LegacyRecidIndex.contains(recid)
 
     def _media_files(self, entry):
         """Transform the media files (lecturemedia files) of a record."""
@@ -373,4 +367,6 @@ class CDSToVideosRecordTransform(RDMRecordTransform):
 
     def run(self, entries):
         """Run transformation step."""
+        owners.invalidate()
+        RDMJsonLogger(collection="weblectures").add_stats_source("owners index", owners)
         return super().run(entries)
@@ -7,7 +7,6 @@
 
 """CDS-Videos user api."""
 import logging
-from copy import deepcopy
 
 from flask import current_app
 from invenio_accounts.models import User, UserIdentity
@@ -57,24 +56,10 @@ class CDSVideosMigrationUserAPI(MigrationUserAPI):
             )
             raise
 
-    def create_user(self, email, name, person_id, username, extra_data=None):
-        """Create an invenio user."""
-        user = self.create_invenio_user(email, username)
-        user_id = user.id
-        profile_data = {}
-        if person_id:
-            identity = self.create_invenio_user_identity(user_id, person_id)
-            db.session.add(identity)
-            profile_data = {
-                "person_id": person_id,
-            }
-        if name:
-            profile = deepcopy(user.user_profile)
-            profile.update(profile_data)
-            user.user_profile = profile
-            db.session.add(user)
-
-        remote_account = self.create_invenio_remote_account(user_id, extra_data)
-        db.session.add(remote_account)
+    def user_profile_data(self, person_id, extra_data):
+        """Return the profile data of a new user."""
+        return {"person_id": person_id} if person_id else {}
 
-        return user
+    def duplicated_username(self, email, username):
+        """Do not create the users whose username is already taken."""
+        return None
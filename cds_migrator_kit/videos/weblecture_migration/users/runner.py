@@ -44,7 +44,9 @@ class VideosSubmitterRunner:
             stream_definition.name,
             extract=stream_definition.extract_cls(**stream_config.get("extract", {})),
             transform=stream_definition.transform_cls(
-                dojson_model=users_migrator_marc21
+                dojson_model=users_migrator_marc21,
+                fields_only=True,
+                submitter_keys=("859__", "856__"),
             ),
             load=stream_definition.load_cls(
                 dry_run=dry_run,
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the MARC21 translation benchmark."""
+
+from cds_migrator_kit.transform.benchmark import (
+    benchmark,
+    compare,
+    synthetic_scenarios,
+)
+
+
+def test_benchmark_synthetic_records(base_app):
+    """Test the synthetic records are translated."""
+    with base_app.app_context():
+        for name, dumps in synthetic_scenarios(sizes=["small"], count=2):
+            result = benchmark(dumps, repeat=1)
+            assert result["records"] == 2
+            assert result["errors"] == 0, result["first_error"]
+            assert result["records_per_sec"] > 0
+            assert result["peak_kib_per_record"] > 0
+
+
+def test_benchmark_compare():
+    """Test regressions are reported against the baseline."""
+    baseline = {
+        "thesis/small": {
+            "records": 20,
+            "errors": 0,
+            "records_per_sec": 100.0,
+            "peak_kib_per_record": 100.0,
+        }
+    }
+    result = dict(baseline["thesis/small"])
+    assert compare({"thesis/small": result}, baseline) == []
+    assert compare({"summer_student_note/small": result}, baseline) == []
+
+    result.update(records_per_sec=70.0, peak_kib_per_record=130.0, errors=1)
+    regressions = compare({"thesis/small": result}, baseline)
+    assert len(regressions) == 3
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the concurrent legacy file ingest."""
+
+import hashlib
+
+import pytest
+
+from cds_migrator_kit.rdm.records.load.files import FileIngest, file_md5, place_file
+
+
+def _opener(filepath):
+    return open(filepath, "rb")
+
+
+def test_file_ingest_stream(tmp_path):
+    """Test files are staged with their checksum and yielded in order."""
+    files = []
+    for index in range(10):
+        content = f"file {index}".encode() * (index * 1000)
+        filepath = tmp_path / f"file{index}.pdf"
+        filepath.write_bytes(content)
+        files.append(
+            {"eos_tmp_path": filepath, "checksum": hashlib.md5(content).hexdigest()}
+        )
+
+    # a budget smaller than some files still loads them, one at a time
+    ingest = FileIngest(_opener, workers=3, byte_budget=20000, spool_size=10000)
+    for file_data, future in ingest.stream(files):
+        staged = future.result()
+        assert staged.checksum == f"md5:{file_data['checksum']}"
+        assert hashlib.md5(staged.stream.read()).hexdigest() == file_data["checksum"]
+        staged.close()
+
+
+def test_file_ingest_missing_file(tmp_path):
+    """Test the read error is raised by the future of the file."""
+    (tmp_path / "file.pdf").write_bytes(b"content")
+    files = [
+        {"eos_tmp_path": tmp_path / "missing.pdf"},
+        {"eos_tmp_path": tmp_path / "file.pdf"},
+    ]
+    stream = FileIngest(_opener).stream(files)
+    _, future = next(stream)
+    with pytest.raises(FileNotFoundError):
+        future.result()
+    stream.close()
+
+
+def test_place_file(tmp_path):
+    """Test the legacy files are linked or moved to the storage location."""
+    source = tmp_path / "legacy" / "file.pdf"
+    source.parent.mkdir()
+    source.write_bytes(b"content")
+    checksum = file_md5(source)
+    assert checksum == f"md5:{hashlib.md5(b'content').hexdigest()}"
+
+    linked = tmp_path / "data" / "12" / "34" / "data"
+    place_file(str(source), str(linked), "link")
+    assert source.exists() and linked.stat().st_ino == source.stat().st_ino
+
+    moved = tmp_path / "data" / "56" / "78" / "data"
+    place_file(str(source), f"file://{moved}", "move")
+    assert not source.exists() and file_md5(moved) == checksum
+
+    with pytest.raises(ValueError):
+        place_file(str(moved), "root://eos.cern.ch//eos/data", "link")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the placement of the legacy files in the buckets."""
+
+import json
+import shutil
+from pathlib import Path
+
+from cds_rdm.legacy.models import CDSMigrationLegacyRecord
+from helpers import config
+from invenio_rdm_records.records.api import RDMRecord
+
+from cds_migrator_kit.rdm.records.streams import RecordStreamDefinition
+from cds_migrator_kit.runner.runner import Runner
+
+DATA_DIR = Path("tests/cds-rdm/data/sspn")
+
+
+def test_move_files_shared_by_versions(
+    test_app,
+    uploader,
+    search_clear,
+    orcid_name_data,
+    community,
+    mocker,
+    tmp_path,
+):
+    """Test the files carried over to the next versions are moved once."""
+    # creates the submitters of the records
+    config(mocker, community, orcid_name_data)
+
+    # 2889522 -> 2 versions, the file of the second one is in both
+    with open(DATA_DIR / "dumps" / "test_records.json") as fp:
+        records = [record for record in json.load(fp) if record["recid"] == 2889522]
+    (tmp_path / "dumps").mkdir()
+    with open(tmp_path / "dumps" / "records.json", "w") as fp:
+        json.dump(records, fp)
+    shutil.copytree(DATA_DIR / "files", tmp_path / "files")
+    staged = tmp_path / "files" / "g251" / "2512545"
+
+    mocker.patch(
+        "cds_migrator_kit.runner.runner.Runner._read_config",
+        return_value={
+            "records": {
+                "sspn": {
+                    "data_dir": str(tmp_path),
+                    "tmp_dir": str(tmp_path / "tmp"),
+                    "log_dir": str(tmp_path / "log"),
+                    "extract": {"dirpath": str(tmp_path / "dumps")},
+                    "transform": {
+                        "files_dump_dir": f"{tmp_path / 'files'}/",
+                        "missing_users": "tests/cds-rdm/data/users",
+                        "community_id": f"{str(community.id)}",
+                    },
+                    "load": {"files_placement": "move"},
+                },
+            },
+        },
+    )
+    runner = Runner(
+        stream_definitions=[RecordStreamDefinition],
+        config_filepath="config.yaml",
+        dry_run=False,
+        collection="sspn",
+    )
+    runner.run()
+
+    (legacy_record,) = CDSMigrationLegacyRecord.query.filter_by(
+        legacy_recid="2889522"
+    ).all()
+    record = RDMRecord.get_record(legacy_record.migrated_record_object_uuid)
+    assert record.versions.index == 2
+    assert list(record.files.entries) == ["Woods_Jesse_cern_SS_report.pdf"]
+    # the staged files are removed once, after the record is loaded
+    assert not (staged / "content.pdf;2").exists()
+    assert (staged / "content.pdf;1").exists()
@@ -8,6 +8,12 @@
 
 """CDS migration to CDSLabs tests."""
 
+from cds_dojson.marc21.utils import create_record
+
+from cds_migrator_kit.rdm.records.transform.models.summer_student_report import (
+    sspn_model,
+)
+from cds_migrator_kit.transform import migrator_marc21
 from cds_migrator_kit.transform.dumper import CDSRecordDump
 from tests.helpers import load_json
 
@@ -242,3 +248,20 @@ def test_migrate_record_all_fields(datadir, base_app):
             "_created": "2019-07-29",
             "record_restriction": "public",
         }
+
+
+def test_migrator_marc21_model_matching(datadir, base_app):
+    """Test the records are dispatched to their model."""
+    with base_app.app_context():
+        data = load_json(datadir, "summer_note.json")
+        matched = migrator_marc21.matched["ssn"]
+        hits = migrator_marc21.hits
+        for _ in range(2):
+            marc_record = create_record(data[0]["record"][-1]["marcxml"])
+            assert migrator_marc21.match(marc_record) is sspn_model
+            migrator_marc21.do(marc_record)
+            assert not migrator_marc21.missing(marc_record)
+
+        assert migrator_marc21.matched["ssn"] == matched + 2
+        # the second record has the same collection tags
+        assert migrator_marc21.hits > hits
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""ROR cache tests."""
+
+import json
+import time
+import zipfile
+
+import requests
+
+from cds_migrator_kit.rdm.affiliations.ror_cache import RORCache
+from cds_migrator_kit.rdm.affiliations.transform import affiliations_search
+
+ROR_DUMP = [
+    {
+        "id": "https://ror.org/01ggx4157",
+        "name": "European Organization for Nuclear Research",
+        "aliases": ["Conseil Européen pour la Recherche Nucléaire"],
+        "acronyms": ["CERN"],
+        "labels": [{"label": "Organisation européenne pour la recherche nucléaire"}],
+    },
+    {
+        "id": "https://ror.org/00000cern",
+        "names": [
+            {"value": "Cern Lab", "types": ["ror_display"]},
+            {"value": "CERN", "types": ["acronym"]},
+        ],
+    },
+]
+
+
+def test_ror_cache_ttl(tmp_path):
+    """Test the expiry of the cached matches."""
+    cache = RORCache(str(tmp_path / "ror.db"), ttl=60, negative_ttl=10)
+    cache.set("  University of  Geneva", [{"chosen": True, "organization": {}}])
+    cache.set("Unknown lab", [])
+    assert cache.get("university of geneva") == [{"chosen": True, "organization": {}}]
+    assert cache.get("UNKNOWN LAB") == []
+    assert cache.get("Other lab") is None
+
+    # older than the negative TTL only
+    cache._connection.execute("UPDATE ror SET fetched = ?", (time.time() - 30,))
+    assert cache.get("University of Geneva")
+    assert cache.get("Unknown lab") is None
+    assert cache.get("Unknown lab", expire=False) == []
+    assert cache.stats == {"hits": 4, "misses": 2, "seeded_hits": 0}
+    cache.close()
+
+
+def test_ror_cache_import_dump(tmp_path):
+    """Test seeding the cache from a zipped ROR dump."""
+    dump = tmp_path / "v1.50-ror-data.zip"
+    with zipfile.ZipFile(dump, "w") as archive:
+        archive.writestr("v1.50-ror-data_schema_v2.json", json.dumps(ROR_DUMP))
+
+    cache = RORCache(str(tmp_path / "ror.db"))
+    cache.set("cern lab", [])
+    assert cache.import_dump(str(dump)) == 2
+
+    # the API responses only
+    assert cache.get("european organization for nuclear research") is None
+    assert cache.get("Cern Lab") == []
+
+    (match,) = cache.get_seeded("european organization for nuclear research")
+    assert match["chosen"] is True
+    assert match["matching_type"] == "EXACT"
+    assert match["organization"]["id"] == "https://ror.org/01ggx4157"
+    assert cache.get_seeded("Organisation Européenne pour la Recherche Nucléaire")
+    (match,) = cache.get_seeded("Conseil Européen pour la Recherche Nucléaire")
+    assert (match["matching_type"], match["chosen"]) == ("ALIAS", False)
+    assert cache.get_seeded("Cern Lab")[0]["chosen"] is True
+    # same acronym for both organizations
+    matches = cache.get_seeded("cern")
+    assert [match["matching_type"] for match in matches] == ["ACRONYM", "ACRONYM"]
+    assert [match["chosen"] for match in matches] == [False, False]
+    assert cache.get_seeded("Unknown lab") is None
+
+    # a new dump replaces the names of the previous one
+    assert cache.import_dump(str(dump)) == 2
+    assert len(cache.get_seeded("cern")) == 2
+    cache.close()
+
+
+def test_affiliations_search_seeded_fallback(tmp_path):
+    """Test the seeded names are used offline or when the API fails."""
+    dump = tmp_path / "ror-data.json"
+    dump.write_text(json.dumps(ROR_DUMP))
+    cache = RORCache(str(tmp_path / "ror.db"))
+    cache.import_dump(str(dump))
+    cache.set("cern lab", [])
+
+    class FailingSession:
+        def get(self, url, params):
+            raise requests.exceptions.ConnectionError()
+
+    chosen, match = affiliations_search("CERN Lab", cache=cache, offline=True)
+    assert (chosen, match) == (False, [])
+    chosen, match = affiliations_search(
+        "European Organization for Nuclear Research",
+        cache=cache,
+        session=FailingSession(),
+    )
+    assert chosen is True
+    assert match["organization"]["id"] == "https://ror.org/01ggx4157"
+    chosen, matches = affiliations_search("CERN", cache=cache, offline=True)
+    assert chosen is False
+    assert len(matches) == 2
+    cache.close()
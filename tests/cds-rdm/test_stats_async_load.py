@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the asynchronous statistics load."""
+
+import csv
+import json
+from types import SimpleNamespace
+
+import pytest
+from opensearchpy.serializer import JSONSerializer
+
+from cds_migrator_kit.rdm.stats.async_load import CDSRecordStatsAsyncLoad
+
+CONFIG = {
+    "SRC_SEARCH_HOSTS": [],
+    "DEST_SEARCH_HOSTS": [],
+    "SRC_SEARCH_SIZE": 2,
+    "SRC_SEARCH_SCROLL": "1m",
+    "DEST_SEARCH_INDEX_PREFIX": "cds-rdm-events-stats",
+    "CONCURRENCY": 3,
+}
+
+
+class FakeOpenSearch:
+    """Async client answering with the legacy events of each recid."""
+
+    def __init__(self, events=None):
+        """Constructor."""
+        self.events = events or {}
+        self.pages = {}
+        self.indexed = {}
+        self.transport = SimpleNamespace(serializer=JSONSerializer())
+        self.indices = SimpleNamespace(refresh=self.refresh)
+
+    def _page(self, scroll_id):
+        hits = self.pages[scroll_id]
+        page, self.pages[scroll_id] = hits[:2], hits[2:]
+        return {
+            "_scroll_id": scroll_id,
+            "hits": {"hits": page, "total": {"value": len(hits)}},
+        }
+
+    async def search(self, index, body, size, scroll=None):
+        """Start scrolling the events of the recids, or count them."""
+        if "aggs" in body:
+            return self._aggregate(index, body)
+        must = body["query"]["bool"]["must"]
+        if "terms" in must[0]:
+            recids = must[0]["terms"]["id_bibrec"]
+        else:
+            recids = [must[0]["match"]["id_bibrec"]]
+        event_type = must[1]["match"]["event_type"]
+        scroll_id = f"{recids}-{event_type}"
+        self.pages[scroll_id] = [
+            event
+            for recid in recids
+            for event in self.events.get(recid, [])
+            if event["_source"]["event_type"] == event_type
+        ]
+        return self._page(scroll_id)
+
+    async def scroll(self, scroll_id, scroll):
+        """Next page of events."""
+        return self._page(scroll_id)
+
+    async def clear_scroll(self, scroll_id):
+        """Stop scrolling."""
+        del self.pages[scroll_id]
+
+    def _aggregate(self, index, body):
+        """Count the legacy events by recid, or the migrated ones by parent."""
+        must = body["query"]["bool"]["must"]
+        counts = {}
+        if "id_bibrec" in must[0]["terms"]:
+            event_type = must[1]["match"]["event_type"]
+            for recid in must[0]["terms"]["id_bibrec"]:
+                counts[recid] = sum(
+                    event["_source"]["event_type"] == event_type
+                    for event in self.events.get(recid, [])
+                )
+        else:
+            prefix = index.rstrip("*")
+            for _index, doc in self.indexed.values():
+                if _index.startswith(prefix):
+                    parent_recid = doc["parent_recid"]
+                    counts[parent_recid] = counts.get(parent_recid, 0) + 1
+        buckets = [{"key": key, "doc_count": count} for key, count in counts.items()]
+        return {"aggregations": {"recids": {"buckets": buckets}}}
+
+    async def refresh(self, index):
+        """Refresh the index."""
+
+    async def bulk(self, body, *args, **kwargs):
+        """Index the events."""
+        lines = body.splitlines()
+        items = []
+        for action, source in zip(lines[::2], lines[1::2]):
+            action = json.loads(action)["create"]
+            self.indexed[action["_id"]] = (action["_index"], json.loads(source))
+            items.append({"create": {**action, "status": 201}})
+        return {"errors": False, "items": items}
+
+    async def close(self):
+        """Close the connections."""
+
+
+def _pageview(recid, index):
+    return {
+        "_index": "cds-2023",
+        "_id": f"{recid}-{index}",
+        "_source": {
+            "id_bibrec": recid,
+            "event_type": "events.pageviews",
+            "unique_session_id": "session",
+            "bot": False,
+            "timestamp": 1703880355592,
+        },
+    }
+
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_async_stats_load(caplog, tmp_path, batch_size):
+    """Test the events of several recids are migrated and validated."""
+    events = {
+        str(recid): [_pageview(recid, index) for index in range(recid)]
+        for recid in range(1, 8)
+    }
+    # a download of a file unknown to the record is not migrated
+    download = _pageview(2, 2)
+    download["_source"].update(
+        event_type="events.downloads", id_bibdoc=1, file_version=1
+    )
+    events["2"].append(download)
+    src, dest = FakeOpenSearch(events), FakeOpenSearch()
+
+    class Load(CDSRecordStatsAsyncLoad):
+        def _client(self, hosts):
+            return dest if hosts is CONFIG["DEST_SEARCH_HOSTS"] else src
+
+    records = [
+        {"legacy_recid": recid, "parent_recid": f"p{recid}", "latest_version": recid}
+        for recid in events
+    ]
+    entries = [
+        (event_type, record)
+        for record in records
+        for event_type in ("events.pageviews", "events.downloads")
+    ]
+    config = {**CONFIG, "SRC_SEARCH_BATCH_SIZE": batch_size}
+    Load(config, "2025-01-01T00:00:00", log_dir=tmp_path).run(entries)
+
+    assert len(dest.indexed) == sum(len(e) for e in events.values()) - 1
+    assert dest.indexed["migrated_7-6"][1]["recid"] == "7"
+    assert not src.pages
+    assert caplog.text.count("Successfully migrated statistics") == len(entries) - 1
+    assert caplog.text.count("Not all events") == 1
+    with open(tmp_path / "stats_reconciliation.csv") as fp:
+        assert list(csv.reader(fp))[1:] == [["2", "p2", "events.downloads", "1", "0"]]
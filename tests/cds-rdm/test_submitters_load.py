@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the creation of the submitters accounts."""
+
+from invenio_accounts.models import User, UserIdentity
+from invenio_oauthclient.models import RemoteAccount
+
+from cds_migrator_kit.rdm.users.api import CDSMigrationUserAPI
+from cds_migrator_kit.users.load import CDSSubmitterLoad
+
+
+def user_data(email, username, person_id=None, name="Some Name"):
+    """Return the arguments of the creation of a user."""
+    return {
+        "email": email,
+        "name": name,
+        "username": username,
+        "person_id": person_id,
+        "extra_data": {"migration": {"note": "MIGRATED INACTIVE ACCOUNT"}},
+    }
+
+
+def existing_user(db, email, username, person_id=None):
+    """Create a user, synced from the authentication service if person_id."""
+    user = User(email=email, username=username, active=True)
+    db.session.add(user)
+    db.session.flush()
+    if person_id:
+        db.session.add(UserIdentity(id=person_id, method="cern", id_user=user.id))
+    db.session.commit()
+    return user
+
+
+def test_create_users(app, db):
+    """Test the new users are created with their identity and account."""
+    user_ids = CDSMigrationUserAPI().create_users(
+        [
+            user_data("jdoe@cern.ch", "jdoe", person_id="1001"),
+            user_data("jroe@cern.ch", "jroe", name=None),
+        ]
+    )
+
+    assert User.query.count() == 2
+    user = User.query.filter_by(email="jdoe@cern.ch").one()
+    assert user_ids["jdoe@cern.ch"] == user.id
+    assert user.active is False
+    assert user.user_profile["person_id"] == "1001"
+    assert UserIdentity.query.filter_by(id="1001").one().id_user == user.id
+    assert RemoteAccount.query.filter_by(user_id=user.id).one().extra_data == {
+        "migration": {"note": "MIGRATED INACTIVE ACCOUNT"}
+    }
+    assert UserIdentity.query.filter_by(id_user=user_ids["jroe@cern.ch"]).count() == 0
+
+
+def test_create_users_existing_email(app, db):
+    """Test an existing email gives the id of its user."""
+    user = existing_user(db, "jdoe@cern.ch", "jdoe")
+
+    user_ids = CDSMigrationUserAPI().create_users(
+        [user_data("JDoe@cern.ch", "otherusername")]
+    )
+
+    assert user_ids == {"JDoe@cern.ch": user.id}
+    assert User.query.count() == 1
+
+
+def test_create_users_synced_person_id(app, db):
+    """Test a person id already synced gives the id of its user."""
+    user = existing_user(db, "john.doe@cern.ch", "johndoe", person_id="1001")
+
+    user_ids = CDSMigrationUserAPI().create_users(
+        [user_data("jdoe@cern.ch", "jdoe", person_id="1001")]
+    )
+
+    assert user_ids == {"jdoe@cern.ch": user.id}
+    assert User.query.count() == 1
+
+
+def test_create_users_taken_username(app, db):
+    """Test a taken username is replaced by the duplicated one."""
+    existing_user(db, "jdoe@cern.ch", "jdoe")
+
+    user_ids = CDSMigrationUserAPI().create_users(
+        [
+            user_data("jdoe2@cern.ch", "JDoe"),
+            # taken by the previous user of the batch
+            user_data("jdoe3@cern.ch", "jdoe"),
+        ]
+    )
+
+    user = User.query.get(user_ids["jdoe2@cern.ch"])
+    assert user.username == "duplicated_JDoe_jdoe2"
+    user = User.query.get(user_ids["jdoe3@cern.ch"])
+    assert user.username == "duplicated_jdoe_jdoe3"
+
+
+def test_create_users_duplicated_person_id_in_batch(app, db):
+    """Test the users of a batch with the same person id are created once."""
+    user_ids = CDSMigrationUserAPI().create_users(
+        [
+            user_data("jdoe@cern.ch", "jdoe", person_id="1001"),
+            user_data("john.doe@cern.ch", "johndoe", person_id="1001"),
+        ]
+    )
+
+    user = User.query.filter_by(email="jdoe@cern.ch").one()
+    assert user_ids == {"jdoe@cern.ch": user.id, "john.doe@cern.ch": user.id}
+    assert User.query.count() == 1
+    assert UserIdentity.query.filter_by(id="1001").count() == 1
+
+
+def test_submitters_load_batch_fallback(app, db, mocker):
+    """Test the users are created one by one when their batch fails."""
+    existing = existing_user(db, "submitter1@cern.ch", "submitter1")
+    create_users = mocker.patch.object(
+        CDSMigrationUserAPI, "create_users", side_effect=ValueError("batch")
+    )
+    load = CDSSubmitterLoad(
+        missing_users_dir="tests/cds-rdm/data/users",
+        user_api_cls=CDSMigrationUserAPI,
+        batch_size=10,
+    )
+
+    load.run(
+        [
+            {"submitter": "submitter1@cern.ch"},
+            {"submitter": "newsubmitter1@cern.ch"},
+            {"submitter": "newsubmitter2@cern.ch"},
+            {"submitter": "newsubmitter1@cern.ch"},
+        ]
+    )
+
+    create_users.assert_called_once()
+    assert load.user_ids["submitter1@cern.ch"] == existing.id
+    for email in ("newsubmitter1@cern.ch", "newsubmitter2@cern.ch"):
+        user = User.query.filter_by(email=email).one()
+        assert load.user_ids[email] == user.id
+    assert User.query.count() == 3
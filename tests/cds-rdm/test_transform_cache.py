@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the caches of the records transform."""
+
+from cds_rdm.legacy.models import CDSMigrationAffiliationMapping
+
+from cds_migrator_kit.rdm.records.transform.cache import (
+    AffiliationMappingCache,
+    VocabularyResolver,
+    search_vocabulary,
+)
+
+SEARCH_VOCABULARY = "cds_migrator_kit.rdm.records.transform.cache.search_vocabulary"
+
+
+def add_mapping(db, legacy_affiliation_input, ror_exact_match=None):
+    """Add an affiliation mapping to the table."""
+    mapping = CDSMigrationAffiliationMapping(
+        legacy_affiliation_input=legacy_affiliation_input,
+        ror_exact_match=ror_exact_match,
+    )
+    db.session.add(mapping)
+    db.session.commit()
+    return mapping
+
+
+def test_affiliation_mapping_cache(app, db):
+    """Test the mappings are queried once, the unknown affiliations included."""
+    mapping = add_mapping(db, "CERN", ror_exact_match="01ggx4157")
+    cache = AffiliationMappingCache(CDSMigrationAffiliationMapping)
+
+    assert cache.get("CERN").ror_exact_match == "01ggx4157"
+    assert cache.get("Unknown") is None
+    assert cache.stats == {"size": 2, "hits": 0, "misses": 2}
+
+    # served from the cache
+    db.session.delete(mapping)
+    add_mapping(db, "Unknown", ror_exact_match="02crff812")
+    assert cache.get("CERN").ror_exact_match == "01ggx4157"
+    assert cache.get("Unknown") is None
+    assert cache.stats == {"size": 2, "hits": 2, "misses": 2}
+
+
+def test_affiliation_mapping_cache_invalidate(app, db):
+    """Test the mappings are queried again once invalidated."""
+    mapping = add_mapping(db, "CERN", ror_exact_match="01ggx4157")
+    cache = AffiliationMappingCache(CDSMigrationAffiliationMapping)
+    cache.warm()
+
+    assert cache.get("CERN").ror_exact_match == "01ggx4157"
+    # the warmed cache has the whole table
+    assert cache.get("Unknown") is None
+    assert cache.stats == {"size": 1, "hits": 2, "misses": 0}
+
+    mapping.ror_exact_match = "02crff812"
+    db.session.commit()
+    cache.invalidate()
+
+    assert cache.stats == {"size": 0, "hits": 2, "misses": 0}
+    assert cache.get("CERN").ror_exact_match == "02crff812"
+    assert cache.get("Unknown") is None
+    assert cache.stats == {"size": 2, "hits": 2, "misses": 2}
+
+
+def search_result(*ids):
+    """Return a vocabulary search result with the ids."""
+    return {"hits": {"total": len(ids), "hits": [{"id": id_} for id_ in ids]}}
+
+
+def test_vocabulary_resolver_unknown_term(mocker):
+    """Test a term without a match is searched once."""
+    search = mocker.patch(SEARCH_VOCABULARY, return_value=search_result())
+    resolver = VocabularyResolver()
+
+    assert resolver.resolve("Klingon", "languages") is None
+    assert resolver.resolve("Klingon", "languages") is None
+    search.assert_called_once_with("Klingon", "languages")
+    assert resolver.stats == {"size": 1, "preloaded": 0, "hits": 1, "misses": 1}
+
+
+def test_vocabulary_resolver_eviction(mocker):
+    """Test the least recently used term is evicted."""
+    search = mocker.patch(
+        SEARCH_VOCABULARY,
+        side_effect=lambda term, vocab_type: search_result(term.lower()),
+    )
+    resolver = VocabularyResolver(maxsize=2)
+
+    assert resolver.resolve("A", "subjects") == "a"
+    assert resolver.resolve("B", "subjects") == "b"
+    # A is used more recently than B
+    assert resolver.resolve("A", "subjects") == "a"
+    assert resolver.resolve("C", "subjects") == "c"
+    assert search.call_count == 3
+
+    assert resolver.resolve("A", "subjects") == "a"
+    assert search.call_count == 3
+    assert resolver.resolve("B", "subjects") == "b"
+    assert search.call_count == 4
+    assert resolver.stats == {"size": 2, "preloaded": 0, "hits": 2, "misses": 4}
+
+
+def test_vocabulary_resolver_preload(app, languages_v, mocker):
+    """Test the preloaded ids are resolved without searching."""
+    search = mocker.patch(SEARCH_VOCABULARY, wraps=search_vocabulary)
+    resolver = VocabularyResolver(preload_types=["languages"])
+    resolver.preload()
+
+    assert resolver.resolve(" ENG", "languages") == "eng"
+    assert resolver.resolve("dan", "languages") == "dan"
+    assert resolver.resolve("Klingon", "languages") is None
+    search.assert_called_once_with("Klingon", "languages")
+    assert resolver.stats == {"size": 1, "preloaded": 2, "hits": 2, "misses": 1}
+
+    resolver.invalidate()
+
+    assert resolver.stats == {"size": 0, "preloaded": 0, "hits": 2, "misses": 1}
+    resolver.resolve("eng", "languages")
+    assert search.call_count == 2
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-RDM is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the transform of the records in worker processes."""
+
+from helpers import config
+
+from cds_migrator_kit.extract.extract import LegacyExtract
+from cds_migrator_kit.rdm.records.transform.transform import (
+    CDSToRDMRecordEntry,
+    CDSToRDMRecordTransform,
+)
+from cds_migrator_kit.reports.log import RDMJsonLogger
+from cds_migrator_kit.transform import migrator_marc21
+from cds_migrator_kit.users.owners import owners
+
+
+def lookups(transform):
+    """Return the number of lookups of the stats sources of a transform."""
+    return {
+        "affiliations": transform.db_state["affiliations"].hits
+        + transform.db_state["affiliations"].misses,
+        "vocabularies": transform.db_state["vocabularies"].hits
+        + transform.db_state["vocabularies"].misses,
+        "owners": owners.hits + owners.misses,
+        "models": migrator_marc21.hits + migrator_marc21.misses,
+        "matched": sum(migrator_marc21.matched.values()),
+    }
+
+
+def run_transform(community, workers):
+    """Transform the test dump and return the results, logs and lookups."""
+    migration_logger = RDMJsonLogger(collection="sspn")
+    migration_logger.start_log()
+    transform = CDSToRDMRecordTransform(
+        workers=workers,
+        throw=False,
+        files_dump_dir="tests/cds-rdm/data/sspn/files/",
+        missing_users="tests/cds-rdm/data/users",
+        community_id=str(community.id),
+    )
+    before = lookups(transform)
+    entries = LegacyExtract("tests/cds-rdm/data/sspn/dumps/").run()
+    results = list(transform.run(entries))
+    # as the load step does
+    for result in results:
+        migration_logger.add_success(result["record"]["recid"])
+    migration_logger.finalise()
+
+    after = lookups(transform)
+    logs = sorted(
+        (dict(row) for row in migration_logger.read_log()),
+        key=lambda row: (row["recid"], row["clean"], row["message"]),
+    )
+    migration_logger.error_file.close()
+    return results, logs, {name: after[name] - before[name] for name in after}
+
+
+def test_transform_workers(test_app, search_clear, orcid_name_data, community, mocker):
+    """Test the records transformed by workers are the serial ones."""
+    # creates the submitters of the records
+    config(mocker, community, orcid_name_data)
+    # the names are in the transaction of the test, which the connections of
+    # the workers do not see
+    mocker.patch.object(CDSToRDMRecordEntry, "_lookup_person_names", return_value={})
+
+    results, logs, counters = run_transform(community, workers=None)
+    worker_results, worker_logs, worker_counters = run_transform(community, workers=2)
+
+    assert results
+    assert worker_results == results
+    # the logs of the workers are merged, the success states sent back
+    assert worker_logs == logs
+    # the usage counters of the workers are merged
+    assert counters["matched"] >= len(results)
+    assert worker_counters == counters
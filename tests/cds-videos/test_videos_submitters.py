@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# CDS-Videos is free software; you can redistribute it and/or modify it under
+# the terms of the MIT License; see LICENSE file for more details.
+
+"""Tests of the creation of the videos submitters accounts."""
+
+import logging
+
+from invenio_accounts.models import User
+
+from cds_migrator_kit.videos.weblecture_migration.users.api import (
+    CDSVideosMigrationUserAPI,
+)
+
+
+def test_create_users_taken_username(app, db, caplog):
+    """Test the users whose username is taken are not created, and logged."""
+    db.session.add(User(email="jdoe@cern.ch", username="jdoe", active=True))
+    db.session.commit()
+
+    with caplog.at_level(logging.ERROR, logger="users"):
+        user_ids = CDSVideosMigrationUserAPI().create_users(
+            [
+                {
+                    "email": "jdoe2@cern.ch",
+                    "name": "John Doe",
+                    "username": "jdoe",
+                    "person_id": None,
+                    "extra_data": {},
+                }
+            ]
+        )
+
+    assert user_ids == {}
+    assert User.query.count() == 1
+    assert "jdoe2@cern.ch, username: jdoe" in caplog.text
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Indexed error log tests."""
+
+import csv
+
+from cds_migrator_kit.reports.error_log import ErrorLogStore
+
+COLUMNS = ["recid", "stage", "message", "clean", "priority"]
+
+
+def test_error_log_pages(tmp_path):
+    """Test the totals and the keyset pages of the error log."""
+    store = ErrorLogStore(str(tmp_path / "errors.db"), COLUMNS)
+    store.open(reset=True)
+    for recid in range(1, 8):
+        if recid % 3:
+            store.add({"recid": recid, "clean": True})
+        else:
+            store.add({"recid": recid, "clean": False, "priority": "critical"})
+    store.close()
+
+    assert store.totals() == {
+        "total": 7,
+        "critical": 2,
+        "warning": 0,
+        "errored": 2,
+        "migrated": 5,
+    }
+    rows, prev_page, next_page = store.page(size=3)
+    assert [row["recid"] for row in rows] == ["1", "2", "3"]
+    assert rows[0]["clean"] == "True" and rows[0]["priority"] == ""
+    assert prev_page is None
+    rows, prev_page, next_page = store.page(after=next_page, size=3)
+    assert [row["recid"] for row in rows] == ["4", "5", "6"]
+    rows, prev_page, next_page = store.page(after=next_page, size=3)
+    assert [row["recid"] for row in rows] == ["7"] and next_page is None
+    rows, prev_page, next_page = store.page(before=prev_page, size=3)
+    assert [row["recid"] for row in rows] == ["4", "5", "6"]
+    rows, _, _ = store.page(errors_only=True)
+    assert [row["recid"] for row in rows] == ["3", "6"]
+
+    # a new run starts from scratch
+    store.open(reset=True)
+    store.close()
+    assert store.totals()["total"] == 0
+
+
+def test_error_log_import_csv(tmp_path):
+    """Test an error log written as CSV only is indexed."""
+    csv_filepath = tmp_path / "errors.csv"
+    with open(csv_filepath, "w") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerow({"recid": 1, "message": "multi\nline", "clean": False})
+        writer.writerow({"recid": 2, "clean": True})
+
+    store = ErrorLogStore(str(tmp_path / "errors.db"), COLUMNS)
+    store.import_csv(str(csv_filepath))
+    assert store.totals()["errored"] == 1
+    rows, _, _ = store.page()
+    assert rows[0]["message"] == "multi\nline"
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Extract tests."""
+
+import io
+import json
+
+import pytest
+
+from cds_migrator_kit.extract.extract import iter_json_array
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024 * 1024])
+def test_iter_json_array(chunk_size):
+    """Test incremental parsing of a JSON dump."""
+    records = [{"recid": i, "title": "Café ∑" * i} for i in range(20)] + [1, []]
+    raw = json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8")
+
+    result = list(iter_json_array(io.BytesIO(raw), chunk_size=chunk_size))
+
+    assert [item for item, _ in result] == records
+    # offsets point right after each item in the file
+    _, offset = result[3]
+    assert raw[:offset].decode("utf-8").endswith("}")
+    assert json.loads(raw[: result[-1][1]] + b"]") == records
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 5])
+def test_iter_json_array_numbers(chunk_size):
+    """Test numbers split across the read chunks."""
+    data = b"[1.5e3, 2, -0.25 ,true]"
+    result = list(iter_json_array(io.BytesIO(data), chunk_size=chunk_size))
+    assert [item for item, _ in result] == [1500.0, 2, -0.25, True]
+
+
+@pytest.mark.parametrize("data", [b"", b"{}", b"[1, 2", b"[1 2]", b"[1] 2"])
+def test_iter_json_array_invalid(data):
+    """Test that malformed dumps are rejected."""
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(data), chunk_size=2))
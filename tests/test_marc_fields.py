@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""MARC fields extraction tests."""
+
+import pytest
+
+from cds_migrator_kit.errors import UnexpectedValue
+from cds_migrator_kit.transform.marc_fields import extract_fields, extract_submitter
+
+MARCXML = """<record xmlns="http://www.loc.gov/MARC21/slim">
+  <controlfield tag="001">2788738</controlfield>
+  <datafield tag="100" ind1=" " ind2=" ">
+    <subfield code="a">Doe, John</subfield>
+    <subfield code="0">AUTHOR|(CDS)2067852</subfield>
+    <subfield code="0">AUTHOR|(SzGeCERN)692828</subfield>
+  </datafield>
+  <datafield tag="700" ind1=" " ind2=" ">
+    <subfield code="a">Roe, Jane</subfield>
+  </datafield>
+  <datafield tag="856" ind1="0" ind2=" ">
+    <subfield code="f">Other@cern.ch</subfield>
+  </datafield>
+  <datafield tag="859" ind1=" " ind2=" ">
+    <subfield code="f">John.Doe@CERN.CH</subfield>
+  </datafield>
+</record>"""
+
+
+def test_extract_fields():
+    """Test the extraction of selected MARC fields."""
+    fields = extract_fields(MARCXML, ["001", "100", "700__"])
+    assert fields == {
+        "001": ["2788738"],
+        "100__": [
+            {
+                "a": ["Doe, John"],
+                "0": ["AUTHOR|(CDS)2067852", "AUTHOR|(SzGeCERN)692828"],
+            }
+        ],
+        "700__": [{"a": ["Roe, Jane"]}],
+    }
+
+
+def test_extract_submitter():
+    """Test the extraction of the submitter email."""
+    assert extract_submitter(MARCXML) == "john.doe@cern.ch"
+    assert extract_submitter(MARCXML, keys=("856__",)) is None
+    # the last field wins, in the record order
+    assert extract_submitter(MARCXML, keys=("859__", "8560_")) == "john.doe@cern.ch"
+    assert extract_submitter(MARCXML, keys=("8560_",)) == "other@cern.ch"
+
+    twice = MARCXML.replace(
+        '<subfield code="f">John.Doe@CERN.CH</subfield>',
+        '<subfield code="f">a@cern.ch</subfield><subfield code="f">b@cern.ch</subfield>',
+    )
+    with pytest.raises(UnexpectedValue):
+        extract_submitter(twice)
+
+
+def test_extract_submitter_last_field():
+    """Test the last of several submitter fields wins, as in the rules."""
+    submitter = '<datafield tag="859" ind1=" " ind2=" ">{}</datafield>'
+    second = MARCXML.replace(
+        "</record>",
+        submitter.format('<subfield code="f">Jane.Roe@cern.ch</subfield>')
+        + "</record>",
+    )
+    assert extract_submitter(second) == "jane.roe@cern.ch"
+    # a last field without email
+    without_email = MARCXML.replace(
+        "</record>", submitter.format('<subfield code="a">x</subfield>') + "</record>"
+    )
+    assert extract_submitter(without_email) is None
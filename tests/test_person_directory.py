@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Person directory tests."""
+
+import json
+import logging
+
+from cds_migrator_kit.users.people import PersonDirectory
+
+
+def test_person_directory_lookup(tmp_path):
+    """Test the lookup of the missing users by email."""
+    (tmp_path / "people.csv").write_text(
+        "John.Doe@cern.ch,12345,John,Doe,IT\n"
+        "john.doe@cern.ch,67890,Johnny,Doe\n"
+        "jane.roe@cern.ch,,Jane,Roe\n"
+    )
+    (tmp_path / "missing_users.json").write_text(
+        json.dumps(
+            [
+                {"email": "old.user@cern.ch", "displayname": "Old User"},
+                {"email": "jane.roe@cern.ch", "displayname": "Jane Roe"},
+            ]
+        )
+    )
+    directory = PersonDirectory(str(tmp_path))
+
+    person, person_old_db = directory.lookup("john.doe@cern.ch")
+    assert person == ["John.Doe@cern.ch", "12345", "John", "Doe", "IT"]
+    assert person_old_db is None
+
+    person, person_old_db = directory.lookup("jane.roe@cern.ch")
+    assert person[1] == ""
+    assert person_old_db["displayname"] == "Jane Roe"
+
+    assert directory.lookup("old.user@cern.ch")[0] is None
+    assert directory.lookup("nobody@cern.ch") == (None, None)
+    assert directory.lookups == 4
+    directory.report(logging.getLogger("users"))
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Pipelined stream tests."""
+
+import threading
+import time
+
+import pytest
+from flask import Flask
+from invenio_rdm_migrator.streams import StreamDefinition
+
+from cds_migrator_kit.runner.pipeline import PipelinedStream
+from cds_migrator_kit.runner.runner import Runner
+
+
+class Extract:
+    """Extract of numbers, failing after ``fail_after`` of them."""
+
+    def __init__(self, count, fail_after=None):
+        """Constructor."""
+        self.count = count
+        self.fail_after = fail_after
+
+    def run(self):
+        """Yield the numbers."""
+        for number in range(self.count):
+            if number == self.fail_after:
+                raise ValueError("extract failed")
+            yield number
+
+
+class Transform:
+    """Transform doubling the numbers, failing after ``fail_after`` of them."""
+
+    def __init__(self, fail_after=None):
+        """Constructor."""
+        self.fail_after = fail_after
+
+    def run(self, entries):
+        """Yield the doubled numbers."""
+        for index, entry in enumerate(entries):
+            if index == self.fail_after:
+                raise ValueError("transform failed")
+            yield entry * 2
+
+
+class Load:
+    """Load keeping the entries, optionally waiting for ``release``."""
+
+    def __init__(self, fail_after=None):
+        """Constructor."""
+        self.fail_after = fail_after
+        self.entries = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def run(self, entries, cleanup=False):
+        """Keep the entries."""
+        for entry in entries:
+            self.started.set()
+            self.release.wait()
+            if len(self.entries) == self.fail_after:
+                raise ValueError("load failed")
+            self.entries.append(entry)
+
+
+@pytest.fixture()
+def app():
+    """Application with its context."""
+    app = Flask("testapp")
+    with app.app_context():
+        yield app
+
+
+def stream_threads(name):
+    """Return the threads of the steps of a stream still alive."""
+    return [thread for thread in threading.enumerate() if thread.name.startswith(name)]
+
+
+def test_pipelined_stream_order(app):
+    """Test the entries are loaded in the extracted order."""
+    load = Load()
+    stream = PipelinedStream("order", Extract(500), Transform(), load, queue_size=3)
+
+    stream.run()
+
+    assert load.entries == [number * 2 for number in range(500)]
+    assert stream._counts == {"extract": 500, "transform": 500, "load": 500}
+    assert stream_threads("order") == []
+
+
+def test_pipelined_stream_backpressure(app):
+    """Test a slow load makes the previous steps wait."""
+    load = Load()
+    load.release.clear()
+    stream = PipelinedStream(
+        "backpressure", Extract(1000), Transform(), load, queue_size=2
+    )
+
+    def run():
+        with app.app_context():
+            stream.run()
+
+    runner = threading.Thread(target=run)
+    runner.start()
+    try:
+        assert load.started.wait(5)
+        # wait for the queues to fill up
+        extracted = -1
+        while extracted != stream._counts["extract"]:
+            extracted = stream._counts["extract"]
+            time.sleep(0.2)
+        # one entry held by each step and a full queue between each of them
+        assert extracted <= 3 + 2 * stream.queue_size
+    finally:
+        load.release.set()
+        runner.join()
+
+    assert len(load.entries) == 1000
+
+
+@pytest.mark.parametrize(
+    "extract, transform, message",
+    [
+        (Extract(1000, fail_after=10), Transform(), "extract failed"),
+        (Extract(1000), Transform(fail_after=10), "transform failed"),
+    ],
+)
+def test_pipelined_stream_step_error(app, extract, transform, message):
+    """Test the error of the extract or transform thread is raised."""
+    load = Load()
+    stream = PipelinedStream("error", extract, transform, load, queue_size=3)
+
+    with pytest.raises(ValueError, match=message):
+        stream.run()
+
+    # the entries extracted before the error, or some of them
+    assert load.entries == [number * 2 for number in range(len(load.entries))]
+    assert len(load.entries) <= 10
+    assert stream_threads("error") == []
+
+
+def test_pipelined_stream_load_error(app):
+    """Test the extract and transform threads stop when the load fails."""
+    load = Load(fail_after=5)
+    stream = PipelinedStream("stop", Extract(1000), Transform(), load, queue_size=3)
+
+    with pytest.raises(ValueError, match="load failed"):
+        stream.run()
+
+    # the steps waiting on the full queues are stopped
+    assert stream._stop.is_set()
+    assert stream_threads("stop") == []
+    assert stream._counts["extract"] < 1000
+
+
+def test_pipelined_runner_rejects_transform_workers(mocker):
+    """Test the transform workers are not forked from a pipelined stream."""
+    mocker.patch(
+        "cds_migrator_kit.runner.runner.Runner._read_config",
+        return_value={"records": {"sspn": {"transform": {"workers": 2}}}},
+    )
+    definition = StreamDefinition("records", None, None, None)
+
+    with pytest.raises(ValueError, match="pipelined"):
+        Runner(
+            stream_definitions=[definition],
+            config_filepath="streams.yaml",
+            dry_run=True,
+            collection="sspn",
+            pipelined=True,
+        )
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 CERN.
+#
+# cds-migrator-kit is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Record dump index tests."""
+
+from cds_migrator_kit.reports.record_dump import RecordDumpIndex, dump_line
+
+
+def test_record_dump_index(tmp_path):
+    """Test records are looked up by recid while the dump grows."""
+    dump_filepath = tmp_path / "records_dump.jsonl"
+    index = RecordDumpIndex(str(dump_filepath))
+    assert index.get("1") is None
+
+    with open(dump_filepath, "w") as dump_file:
+        for recid in range(1, 4):
+            dump_file.write(dump_line(recid, {"title": f'"Café" {recid}'}))
+        # a record being written
+        dump_file.write(dump_line(4, {"title": "4"})[:10])
+
+    assert index.get(2) == {"title": '"Café" 2'}
+    assert index.get("4") is None
+
+    with open(dump_filepath, "a") as dump_file:
+        dump_file.write(dump_line(4, {"title": "4"})[10:])
+        # a record transformed again replaces the previous one
+        dump_file.write(dump_line(2, {"title": "new"}))
+    assert index.get("4") == {"title": "4"}
+    assert index.get("2") == {"title": "new"}
+
+    # the dump of a new run
+    with open(dump_filepath, "w") as dump_file:
+        dump_file.write(dump_line(5, {"title": "5"}))
+    assert index.get("5") == {"title": "5"}
+    assert index.get("1") is None